@@ -0,0 +1,134 @@
+import cv2
+import numpy as np
+
+from reference_images import REFERENCE_DIR, files_signature, load_cache, reference_files, save_cache
+
+
+class AreaRecognizer:
+    """
+    Kenali area PCB yang sedang dilihat kamera dengan ORB.
+
+    Gambar referensi disimpan per area: <reference_dir>/<Area N>/*.png.
+    Descriptor semua referensi digabung jadi satu array (dengan label area)
+    dan di-cache ke `cache_path`; cache dibangun ulang otomatis kalau isi
+    folder referensi berubah. Per frame cukup satu knnMatch Hamming ke array
+    gabungan, lalu match yang lolos ratio test di-vote per area.
+
+    update() memberi area hanya setelah menang `confirm_frames` kali berturut-
+    turut, supaya area tidak bolak-balik waktu kamera sedang digeser.
+    """
+    def __init__(self, reference_dir=REFERENCE_DIR, cache_path="area_descriptors.npz",
+                 n_features=500, process_width=480, ratio=0.75, min_matches=20,
+                 min_margin=1.5, confirm_frames=3):
+        self.reference_dir = reference_dir
+        self.cache_path = cache_path
+        self.process_width = process_width
+        self.ratio = ratio
+        self.min_matches = min_matches
+        self.min_margin = min_margin
+        self.confirm_frames = confirm_frames
+
+        self.orb = cv2.ORB_create(nfeatures=n_features)
+        self.matcher = cv2.BFMatcher(cv2.NORM_HAMMING)
+
+        self.areas = []
+        self.descriptors = None
+        self.labels = None
+
+        self.candidate = None
+        self.candidate_frames = 0
+        self.last_scores = {}
+
+    @property
+    def is_ready(self):
+        return self.descriptors is not None and len(self.descriptors) > 0
+
+    def _gray(self, image):
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        h, w = gray.shape[:2]
+        if w > self.process_width:
+            scale = self.process_width / w
+            gray = cv2.resize(gray, (self.process_width, max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+        return gray
+
+    def compute(self, image):
+        _, descriptors = self.orb.detectAndCompute(self._gray(image), None)
+        return descriptors
+
+    def reference_files(self):
+        """Returns: [(area, path), ...] dari folder referensi"""
+        return reference_files(self.reference_dir)
+
+    def load(self):
+        """Pakai cache kalau masih cocok dengan folder referensi, kalau tidak bangun ulang"""
+        files = self.reference_files()
+        if not files:
+            return False
+        signature = files_signature(files)
+
+        data = load_cache(self.cache_path, signature)
+        if data is not None:
+            self.areas = [str(a) for a in data["areas"]]
+            self.descriptors = data["descriptors"]
+            self.labels = data["labels"]
+            return self.is_ready
+
+        self.build(files)
+        if self.is_ready:
+            save_cache(self.cache_path, signature, areas=np.array(self.areas),
+                       descriptors=self.descriptors, labels=self.labels)
+        return self.is_ready
+
+    def build(self, files):
+        self.areas = sorted(set(area for area, _ in files))
+        all_descriptors, all_labels = [], []
+        for area, path in files:
+            image = cv2.imread(path)
+            if image is None:
+                continue
+            descriptors = self.compute(image)
+            if descriptors is None:
+                continue
+            all_descriptors.append(descriptors)
+            all_labels.append(np.full(len(descriptors), self.areas.index(area), dtype=np.int32))
+
+        if all_descriptors:
+            self.descriptors = np.vstack(all_descriptors)
+            self.labels = np.concatenate(all_labels)
+
+    def recognize(self, frame):
+        """
+        Returns: (area, votes) untuk satu frame, area = None kalau tidak yakin
+        """
+        if not self.is_ready:
+            return None, 0
+        descriptors = self.compute(frame)
+        if descriptors is None or len(descriptors) < 2:
+            self.last_scores = {}
+            return None, 0
+
+        good = [m[0].trainIdx for m in self.matcher.knnMatch(descriptors, self.descriptors, k=2)
+                if len(m) == 2 and m[0].distance < self.ratio * m[1].distance]
+        votes = np.bincount(self.labels[good], minlength=len(self.areas)) if good else np.zeros(len(self.areas), dtype=np.int64)
+        self.last_scores = {area: int(v) for area, v in zip(self.areas, votes) if v}
+
+        order = np.argsort(votes)[::-1]
+        best = int(votes[order[0]])
+        runner_up = int(votes[order[1]]) if len(order) > 1 else 0
+        if best < self.min_matches or best < self.min_margin * runner_up:
+            return None, best
+        return self.areas[order[0]], best
+
+    def update(self, frame):
+        """Returns: area yang sudah konsisten `confirm_frames` kali, atau None"""
+        area, _ = self.recognize(frame)
+        if area is None or area != self.candidate:
+            self.candidate = area
+            self.candidate_frames = 1 if area is not None else 0
+            return area if area is not None and self.confirm_frames <= 1 else None
+        self.candidate_frames += 1
+        return area if self.candidate_frames >= self.confirm_frames else None
+
+    def reset(self):
+        self.candidate = None
+        self.candidate_frames = 0
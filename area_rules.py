@@ -1,3 +1,11 @@
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+
+from class_taxonomy import get_taxonomy
+
 AREA_RULES:dict[str, dict[str, int]]={
     "Area 1": {
         "Dioda : 2",
@@ -46,19 +54,117 @@ AREA_RULES:dict[str, dict[str, int]]={
     }
 }
 
-def parse_area_rules(area_name: str) -> dict[str, int]:
-    """
-    Convert set of 'Component: count' strings to dict
-    Returns: {"Component": count}
-    """
-    rules_set = AREA_RULES.get(area_name, set())
+def _parse_rules_set(rules_set):
     parsed = {}
-    
     for rule in rules_set:
         if ":" in rule:
             parts = rule.split(":")
             component = parts[0].strip()
             count = int(parts[1].strip())
             parsed[component] = count
-    
-    return parsed
\ No newline at end of file
+    return parsed
+
+@lru_cache(maxsize=None)
+def _parse_area_rules_cached(area_name):
+    return _parse_rules_set(AREA_RULES.get(area_name, set()))
+
+def parse_area_rules(area_name: str) -> dict[str, int]:
+    """
+    Convert set of 'Component: count' strings to dict
+    Returns: {"Component": count}
+    """
+    return dict(_parse_area_rules_cached(area_name))
+
+
+class CompiledAreaRules:
+    """
+    AREA_RULES yang sudah dikompilasi ke index class model.
+
+    expected[a, c] = jumlah class c yang diharapkan di area a
+    ruled[a, c]    = class c punya rule di area a
+    defect_mask[c] = class "No ..." (komponen hilang)
+    Komponen di rules yang tidak ada di model.names disimpan di `unmapped`
+    supaya tetap dilaporkan sebagai missing. components[area] menyimpan
+    (nama, cls_id atau -1, jumlah) sesuai urutan rules untuk laporan.
+    """
+    def __init__(self, area_rules, names):
+        self.area_names = list(area_rules.keys())
+        self.area_index = {area: i for i, area in enumerate(self.area_names)}
+        self.n_classes = max(names.keys()) + 1 if names else 0
+
+        self.class_names = [""] * self.n_classes
+        for cls_id, cls_name in names.items():
+            self.class_names[cls_id] = cls_name
+        name_to_id = {name: cls_id for cls_id, name in names.items()}
+
+        taxonomy = get_taxonomy(names)
+        self.defect_mask = taxonomy.is_missing
+        # Nama komponen di output validasi tetap seperti di class name ("No resitor" -> "resitor"),
+        # taxonomy.base_component (sudah dinormalisasi) hanya untuk pencocokan footprint
+        self.defect_base = [name[3:] if self.defect_mask[i] else None
+                            for i, name in enumerate(self.class_names)]
+
+        self.expected = np.zeros((len(self.area_names), self.n_classes), dtype=np.int32)
+        self.ruled = np.zeros((len(self.area_names), self.n_classes), dtype=bool)
+        self.rules = {}
+        self.unmapped = {}
+        self.components = {}
+
+        for a, area in enumerate(self.area_names):
+            rules = _parse_rules_set(area_rules[area])
+            self.rules[area] = rules
+            self.unmapped[area] = {}
+            self.components[area] = []
+            for component, count in rules.items():
+                cls_id = name_to_id.get(component)
+                if cls_id is None or self.defect_mask[cls_id]:
+                    self.unmapped[area][component] = count
+                    self.components[area].append((component, -1, count))
+                    continue
+                self.components[area].append((component, cls_id, count))
+                self.expected[a, cls_id] = count
+                self.ruled[a, cls_id] = True
+
+    def has_area(self, area_name):
+        return area_name in self.area_index and bool(self.rules[area_name])
+
+    def count_vector(self, area_name, cls):
+        """Hitung komponen OK per class id (bincount) untuk class yang punya rule di area"""
+        a = self.area_index[area_name]
+        ok = self.ruled[a][cls]
+        return np.bincount(cls[ok], minlength=self.n_classes), ok
+
+    def difference(self, area_name, counts):
+        """actual - expected per class id (negatif = kurang, positif = lebih)"""
+        a = self.area_index[area_name]
+        return np.where(self.ruled[a], counts - self.expected[a], 0)
+
+
+_compiled_cache = {}
+
+def load_area_rules(path):
+    """Baca rules dari file JSON: {"Area 1": ["Dioda: 2", ...], ...}"""
+    with open(path) as f:
+        return {area: set(rules) for area, rules in json.load(f).items()}
+
+def compile_area_rules(names, rules_file=None):
+    """
+    Kompilasi rules untuk model.names tertentu. Hasilnya di-cache per
+    (rules file + mtime, model names), jadi hanya dibangun ulang kalau
+    salah satunya berubah. Tanpa rules_file dipakai AREA_RULES di modul ini.
+    """
+    if rules_file is not None:
+        source_key = (os.path.abspath(rules_file), os.path.getmtime(rules_file))
+    else:
+        source_key = ("<AREA_RULES>", 0)
+    key = (source_key, tuple(sorted(names.items())))
+
+    compiled = _compiled_cache.get(key)
+    if compiled is None:
+        area_rules = load_area_rules(rules_file) if rules_file is not None else AREA_RULES
+        compiled = CompiledAreaRules(area_rules, names)
+        # Versi lama dari sumber yang sama tidak dipakai lagi
+        for old_key in [k for k in _compiled_cache if k[0][0] == source_key[0] and k[1] == key[1]]:
+            del _compiled_cache[old_key]
+        _compiled_cache[key] = compiled
+    return compiled
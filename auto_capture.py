@@ -0,0 +1,88 @@
+import time
+
+
+class AutoCapture:
+    """
+    Capture otomatis setelah hasil deteksi stabil.
+
+    Capture dipicu kalau jumlah komponen (dan status validasi) tidak berubah
+    selama `dwell_time` detik, stability window >= `min_stability`, dan window
+    sudah berisi minimal `min_frames` frame. Setiap area hanya dipicu sekali
+    sampai start_area() dipanggil lagi.
+
+    Waktu per area dicatat dari area dipilih sampai di-capture.
+    """
+    def __init__(self, dwell_time=1.5, min_stability=0.8, min_frames=10):
+        self.dwell_time = dwell_time
+        self.min_stability = min_stability
+        self.min_frames = min_frames
+
+        self.area = None
+        self.area_started = None
+        self.signature = None
+        self.stable_since = None
+        self.fired = False
+
+        self.area_times = {}
+        self.auto_captures = 0
+
+    def start_area(self, area_name, now=None):
+        self.area = area_name
+        self.area_started = time.time() if now is None else now
+        self.signature = None
+        self.stable_since = None
+        self.fired = False
+
+    def update(self, counts, validation, stability, n_frames, now=None):
+        """
+        counts: dict {cls_id: count} hasil agregasi, validation: dict / None
+        Returns: True kalau area sekarang harus di-capture
+        """
+        if self.area is None or self.fired:
+            return False
+
+        now = time.time() if now is None else now
+        status = validation["status"] if validation else None
+        signature = (status, tuple(sorted(counts.items())))
+
+        if not counts or stability < self.min_stability or n_frames < self.min_frames:
+            self.signature = None
+            self.stable_since = None
+            return False
+
+        if signature != self.signature:
+            self.signature = signature
+            self.stable_since = now
+            return False
+
+        if now - self.stable_since >= self.dwell_time:
+            self.fired = True
+            self.auto_captures += 1
+            return True
+        return False
+
+    def dwell_progress(self, now=None):
+        """0..1, seberapa lama hasil sudah stabil dibanding dwell_time"""
+        if self.stable_since is None or self.fired:
+            return 0.0
+        now = time.time() if now is None else now
+        return min(1.0, (now - self.stable_since) / self.dwell_time)
+
+    def finish_area(self, area_name, now=None):
+        """Catat lama inspeksi area. Returns: detik sejak area dipilih (None kalau tidak tercatat)"""
+        if area_name != self.area or self.area_started is None:
+            return None
+        now = time.time() if now is None else now
+        elapsed = now - self.area_started
+        self.area_times[area_name] = elapsed
+        self.fired = True
+        return elapsed
+
+    def get_stats(self):
+        times = list(self.area_times.values())
+        return {
+            "auto_captures": self.auto_captures,
+            "areas_timed": len(times),
+            "mean_area_time": sum(times) / len(times) if times else 0.0,
+            "total_time": sum(times),
+        }
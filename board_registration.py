@@ -0,0 +1,177 @@
+import time
+
+import cv2
+import numpy as np
+
+from motion_gate import SceneChangeDetector
+from reference_images import REFERENCE_DIR, files_signature, golden_files, load_cache, save_cache
+
+
+class BoardRegistration:
+    """
+    Registrasi frame ke golden image per area (homography ORB + RANSAC).
+
+    Golden image = <reference_dir>/<Area N>/golden.png, atau gambar pertama
+    di folder itu. Keypoint (koordinat golden resolusi penuh) dan descriptor
+    dihitung sekali lalu disimpan di `cache_path`.
+
+    Homography hanya diestimasi ulang kalau thumbnail frame berubah dibanding
+    estimasi terakhir (SceneChangeDetector); selama board diam H terakhir
+    dipakai ulang. H memetakan koordinat frame -> koordinat golden.
+    """
+    def __init__(self, reference_dir=REFERENCE_DIR, cache_path="golden_keypoints.npz",
+                 n_features=800, process_width=640, ratio=0.75, min_inliers=15,
+                 ransac_threshold=4.0, motion_threshold=2.0, refresh_interval=90):
+        self.reference_dir = reference_dir
+        self.cache_path = cache_path
+        self.process_width = process_width
+        self.ratio = ratio
+        self.min_inliers = min_inliers
+        self.ransac_threshold = ransac_threshold
+
+        self.orb = cv2.ORB_create(nfeatures=n_features)
+        self.matcher = cv2.BFMatcher(cv2.NORM_HAMMING)
+        self.motion = SceneChangeDetector(threshold=motion_threshold, refresh_interval=refresh_interval)
+
+        self.loaded = False
+        self.golden = {}  # area -> {"points", "descriptors", "size", "path"}
+
+        self.area = None
+        self.homography = None
+        self.inliers = 0
+        self.estimates = 0
+        self.reused = 0
+        self.failures = 0
+        self.last_ms = 0.0
+
+    def detect(self, image):
+        """ORB pada gambar yang diperkecil, keypoint dikembalikan ke skala asli"""
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        h, w = gray.shape[:2]
+        scale = 1.0
+        if w > self.process_width:
+            scale = self.process_width / w
+            gray = cv2.resize(gray, (self.process_width, max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+        keypoints, descriptors = self.orb.detectAndCompute(gray, None)
+        points = np.array([kp.pt for kp in keypoints], dtype=np.float32).reshape(-1, 2) / scale
+        return points, descriptors
+
+    def load(self):
+        files = golden_files(self.reference_dir)
+        signature = files_signature(sorted(files.items()))
+        self.loaded = True
+        self.golden = {}
+        if not files:
+            return False
+
+        data = load_cache(self.cache_path, signature)
+        if data is not None:
+            for i, area in enumerate(str(a) for a in data["areas"]):
+                self.golden[area] = {
+                    "points": data[f"points_{i}"],
+                    "descriptors": data[f"descriptors_{i}"],
+                    "size": tuple(int(v) for v in data[f"size_{i}"]),
+                    "path": files[area],
+                }
+            return bool(self.golden)
+
+        arrays = {}
+        for area, path in sorted(files.items()):
+            image = cv2.imread(path)
+            if image is None:
+                continue
+            points, descriptors = self.detect(image)
+            if descriptors is None or len(points) < self.min_inliers:
+                continue
+            i = len(self.golden)
+            self.golden[area] = {"points": points, "descriptors": descriptors,
+                                 "size": image.shape[1::-1], "path": path}
+            arrays[f"points_{i}"] = points
+            arrays[f"descriptors_{i}"] = descriptors
+            arrays[f"size_{i}"] = np.array(image.shape[1::-1])
+
+        if self.golden:
+            save_cache(self.cache_path, signature, areas=np.array(list(self.golden.keys())), **arrays)
+        return bool(self.golden)
+
+    def has_area(self, area_name):
+        if not self.loaded:
+            self.load()
+        return area_name in self.golden
+
+    def estimate(self, area_name, frame):
+        """Returns: (H frame->golden, jumlah inlier), H = None kalau gagal"""
+        golden = self.golden[area_name]
+        points, descriptors = self.detect(frame)
+        if descriptors is None or len(points) < self.min_inliers:
+            return None, 0
+
+        matches = self.matcher.knnMatch(descriptors, golden["descriptors"], k=2)
+        good = [m[0] for m in matches if len(m) == 2 and m[0].distance < self.ratio * m[1].distance]
+        if len(good) < self.min_inliers:
+            return None, len(good)
+
+        src = points[[m.queryIdx for m in good]]
+        dst = golden["points"][[m.trainIdx for m in good]]
+        H, mask = cv2.findHomography(src, dst, cv2.RANSAC, self.ransac_threshold)
+        inliers = int(mask.sum()) if mask is not None else 0
+        if H is None or inliers < self.min_inliers:
+            return None, inliers
+        return H, inliers
+
+    def update(self, area_name, frame):
+        """
+        Registrasi frame ke golden area. Estimasi ulang hanya kalau area
+        berganti atau frame bergerak sejak estimasi terakhir.
+        Returns: H frame->golden (None kalau belum teregistrasi)
+        """
+        if area_name is None or not self.has_area(area_name):
+            self.area = None
+            self.homography = None
+            return None
+
+        if area_name != self.area:
+            self.area = area_name
+            self.homography = None
+            self.motion.force_refresh()
+
+        moved = self.motion.should_process(frame)
+        if not moved and self.homography is not None:
+            self.reused += 1
+            return self.homography
+
+        start = time.perf_counter()
+        H, self.inliers = self.estimate(area_name, frame)
+        self.last_ms = (time.perf_counter() - start) * 1000
+        self.estimates += 1
+        if H is None:
+            self.failures += 1
+            # Coba lagi di frame berikutnya walaupun board tidak bergerak
+            self.motion.force_refresh()
+        self.homography = H
+        return H
+
+    def to_golden(self, points):
+        """Titik (N x 2) di frame -> koordinat golden. None kalau belum teregistrasi"""
+        if self.homography is None:
+            return None
+        points = np.asarray(points, dtype=np.float32).reshape(-1, 1, 2)
+        return cv2.perspectiveTransform(points, self.homography).reshape(-1, 2)
+
+    def to_frame(self, points):
+        """Titik (N x 2) di golden -> koordinat frame"""
+        if self.homography is None:
+            return None
+        points = np.asarray(points, dtype=np.float32).reshape(-1, 1, 2)
+        return cv2.perspectiveTransform(points, np.linalg.inv(self.homography)).reshape(-1, 2)
+
+    def get_stats(self):
+        return {
+            "area": self.area,
+            "registered": self.homography is not None,
+            "inliers": self.inliers,
+            "estimates": self.estimates,
+            "reused": self.reused,
+            "failures": self.failures,
+            "last_ms": self.last_ms,
+        }
@@ -0,0 +1,119 @@
+import numpy as np
+
+# Typo waktu anotasi dataset -> ejaan yang dipakai di tampilan
+NAME_FIXES = {
+    "resitor": "resistor",
+    "missalignment": "misalignment",
+}
+
+# Ejaan lain untuk komponen yang sama (supaya "No capacitor" ketemu class "Capasitor")
+SPELLING_VARIANTS = {
+    "capacitor": "capasitor",
+    "diode": "dioda",
+}
+
+DEFECT_COLOR = (0, 0, 255)
+OK_COLOR = (0, 255, 0)
+
+
+def normalize_name(name):
+    words = []
+    for word in name.strip().split():
+        fixed = NAME_FIXES.get(word.lower())
+        if fixed is not None:
+            word = fixed.capitalize() if word[:1].isupper() else fixed
+        words.append(word)
+    return " ".join(words)
+
+
+def canonical_key(name):
+    key = normalize_name(name).lower()
+    return SPELLING_VARIANTS.get(key, key)
+
+
+class ClassTaxonomy:
+    """
+    Tabel sifat setiap class model, dibangun sekali dari model.names.
+
+    Semua field diindex dengan class id:
+    is_missing  : class "No ..." (komponen hilang)
+    is_defect   : missing + "wrong component" + "Missalignment"
+    defect_kind : "missing" / "wrong" / "misalignment" / None
+    base_component : nama komponen dasar (mis. "No resitor" -> "Resistor")
+    needs_ocr   : resistor yang terpasang (perlu dibaca marking-nya)
+    color, label : warna BGR dan teks label untuk digambar
+    """
+    def __init__(self, names):
+        self.names = dict(names)
+        n_classes = max(self.names.keys()) + 1 if self.names else 0
+
+        self.class_names = [""] * n_classes
+        for cls_id, name in self.names.items():
+            self.class_names[cls_id] = name
+
+        ok_lookup = {}
+        for name in self.class_names:
+            lowered = name.lower()
+            if name and not lowered.startswith("no ") and "wrong" not in lowered and "alignment" not in lowered:
+                ok_lookup[canonical_key(name)] = name
+
+        self.is_missing = np.zeros(n_classes, dtype=bool)
+        self.is_defect = np.zeros(n_classes, dtype=bool)
+        self.needs_ocr = np.zeros(n_classes, dtype=bool)
+        self.defect_kind = [None] * n_classes
+        self.base_component = [""] * n_classes
+        self.label = [""] * n_classes
+        self.color = [OK_COLOR] * n_classes
+
+        for cls_id, name in enumerate(self.class_names):
+            lowered = name.lower()
+            normalized = normalize_name(name)
+
+            if lowered.startswith("no "):
+                kind = "missing"
+                base = normalize_name(name[3:])
+                base = ok_lookup.get(canonical_key(base), base[:1].upper() + base[1:])
+            elif "wrong" in lowered:
+                kind = "wrong"
+                base = name
+            elif "alignment" in lowered:
+                kind = "misalignment"
+                base = name
+            else:
+                kind = None
+                base = name
+
+            self.defect_kind[cls_id] = kind
+            self.is_missing[cls_id] = kind == "missing"
+            self.is_defect[cls_id] = kind is not None
+            self.base_component[cls_id] = base
+            self.needs_ocr[cls_id] = kind is None and "resistor" in lowered
+            self.label[cls_id] = normalized
+            self.color[cls_id] = DEFECT_COLOR if kind is not None else OK_COLOR
+
+    def __len__(self):
+        return len(self.class_names)
+
+    def count_defects(self, counts):
+        """counts: dict {cls_id: count} -> jumlah defect"""
+        return sum(count for cls_id, count in counts.items() if self.is_defect[cls_id])
+
+    def split_missing(self, counts):
+        """Pisahkan counts jadi ({nama: count} OK, {nama: count} missing)"""
+        ok_components, missing_components = {}, {}
+        for cls_id, count in counts.items():
+            target = missing_components if self.is_missing[cls_id] else ok_components
+            target[self.label[cls_id]] = count
+        return ok_components, missing_components
+
+
+_taxonomy_cache = {}
+
+def get_taxonomy(names):
+    """ClassTaxonomy untuk model.names, di-cache per isi names"""
+    key = tuple(sorted(names.items()))
+    taxonomy = _taxonomy_cache.get(key)
+    if taxonomy is None:
+        taxonomy = ClassTaxonomy(names)
+        _taxonomy_cache[key] = taxonomy
+    return taxonomy
@@ -1,4 +1,4 @@
-from ultralytics import YOLO
+from inference_engine import load_engine
 import cv2
 from collections import defaultdict
 from datetime import datetime
@@ -15,7 +15,7 @@ class PCBDetectionApp:
         self.root.geometry("1280x800")
         
         # Load model
-        self.model = YOLO("/home/syahla/PCB_QualityControl/KP_best5.pt")
+        self.model = load_engine("/home/syahla/PCB_QualityControl/KP_best5.pt")
         self.CONF_THRESHOLD = 0.5
         
         # Video capture
@@ -1,6 +1,7 @@
 from unittest import result
-from ultralytics import YOLO
+from inference_server import load_model
 import cv2
+import numpy as np
 from collections import defaultdict
 from datetime import datetime
 import tkinter as tk
@@ -12,6 +13,7 @@ import time
 
 from cam_detection import CameraDetector
 from filtering_area import filter_detections, get_area_component_list
+from tracker import ComponentTracker
 
 class PCBDetectionApp:
     def __init__(self, root):
@@ -27,8 +29,12 @@ class PCBDetectionApp:
 
         self.root.geometry(f"{window_width}x{window_height}+{position_x}+{position_y}")
 
-        self.model = YOLO("c:/Users/syahla/Downloads/2_runs_merging_yolov8_100/content/runs/detect/train/weights/best.pt")
+        self.model = load_model("c:/Users/syahla/Downloads/2_runs_merging_yolov8_100/content/runs/detect/train/weights/best.pt")
         self.CONF_THRESHOLD = 0.64
+        # Model jalan dengan conf rendah, deteksi lemah hanya dipakai untuk
+        # melanjutkan track yang sudah ada (asosiasi dua tahap)
+        self.TRACK_LOW_CONF = 0.3
+        self.tracker = ComponentTracker(high_conf=self.CONF_THRESHOLD, low_conf=self.TRACK_LOW_CONF)
 
         self.cap = None
         self.is_running = False
@@ -245,6 +251,7 @@ class PCBDetectionApp:
 
         self.current_area = area_name
         self.current_area_mode = True
+        self.tracker.reset()
 
         # Update button states - highlight yang dipilih
         for area, button in self.area_buttons.items():
@@ -350,6 +357,7 @@ class PCBDetectionApp:
         self.current_area = None
         self.current_area_mode = False  # TAMBAH ini
         self.last_validation = None     # TAMBAH ini
+        self.tracker.reset()
         self.button_summary.config(state=tk.DISABLED)
         self.button_capture_area.config(state=tk.DISABLED)  # TAMBAH ini
 
@@ -555,6 +563,7 @@ class PCBDetectionApp:
                 self.status_label.config(text=f"Failed to open camera {camera_index} with all methods")
                 return
 
+        self.tracker.reset()
         self.is_running = True
         self.button_start.config(state=tk.DISABLED)
         self.button_stop.config(state=tk.NORMAL)
@@ -663,34 +672,31 @@ class PCBDetectionApp:
                 self.root.after(0, lambda: self.status_label.config(text="Cannot read frame"))
                 break
 
-            results = self.model(frame, conf=self.CONF_THRESHOLD, verbose=False)
-            result = results[0]
+            # Satu kali ambil array dari tensor, tidak ada loop per box
+            xyxy, confs, classes = self.model.predict(frame, conf=self.TRACK_LOW_CONF)[0]
+
+            # Deteksi -> track; hanya track confirmed (komponen fisik yang stabil)
+            # yang dihitung dan digambar
+            tracks = self.tracker.update(xyxy, confs, classes)
+            xyxy, confs, classes, track_ids = self.tracker.to_arrays(tracks)
             
             if self.current_area_mode and self.current_area:
-                filtered_boxes, validation = filter_detections(self.current_area, result.boxes, self.model)
+                keep, validation = filter_detections(self.current_area, (xyxy, confs, classes), self.model)
                 self.last_validation = validation  # Simpan untuk capture nanti
-                boxes_to_process = filtered_boxes
             else:
-                boxes_to_process = result.boxes
+                keep = np.arange(len(classes))
                 self.last_validation = None
             
-            best_boxes = {}
-            for box in boxes_to_process:
-                cls_id = int(box.cls[0])
-                conf = float(box.conf[0])
-                if cls_id not in best_boxes or conf >= best_boxes[cls_id]['conf']:
-                    best_boxes[cls_id] = {'conf': conf, 'box': box}
-            
             # Reset max_count untuk frame saat ini
             self.max_count = defaultdict(int)
             annotated = frame.copy()
             
-            for cls_id, data in best_boxes.items():
-                self.max_count[cls_id] = 1
-                box = data['box']
-                x1, y1, x2, y2 = map(int, box.xyxy[0])
-                conf = data['conf']
-                label = f"{self.model.names[cls_id]}: {conf:.2f}"
+            for i in keep:
+                cls_id = int(classes[i])
+                self.max_count[cls_id] += 1
+                x1, y1, x2, y2 = xyxy[i].astype(int).tolist()
+                conf = float(confs[i])
+                label = f"#{track_ids[i]} {self.model.names[cls_id]}: {conf:.2f}"
                 
                 # if label.startswith("No capacitor") or label.startswith("wrong component") or label.startswith("No jackcable"):
                 #     cv2.rectangle(annotated, (x1, y1), (x2, y2), (0, 0, 255), 2)
@@ -824,6 +830,8 @@ class PCBDetectionApp:
     
     def on_closing(self):
         self.stop_camera()
+        if hasattr(self.model, "close"):
+            self.model.close()
         self.root.destroy()
 
 def main():
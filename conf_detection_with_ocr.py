@@ -1,6 +1,7 @@
 from unittest import result
-from ultralytics import YOLO
+from inference_server import load_model
 import cv2
+import numpy as np
 from collections import defaultdict
 from datetime import datetime
 import tkinter as tk
@@ -8,11 +9,27 @@ from tkinter import ttk, messagebox
 from PIL import Image, ImageTk
 import threading
 import platform
+import os
 import time
 
 from cam_detection import CameraDetector
-from filtering_area import filter_detections, get_area_component_list
+from frame_grabber import FrameGrabber
+from frame_pool import FramePool
+from filtering_area import filter_detections, validate_counts, get_area_component_list
 from ocr_resistor import resistor_OCR
+from ocr_worker import OCRWorkerPool
+from ocr_cache import OCRCache
+from ocr_consensus import MarkingConsensus
+from quality_gate import FrameQualityGate
+from motion_gate import SceneChangeDetector
+from class_taxonomy import get_taxonomy
+from tracker import ComponentTracker
+from count_window import CountWindow
+from auto_capture import AutoCapture
+from area_recognizer import AreaRecognizer
+from board_registration import BoardRegistration
+from footprint_layout import FootprintMatcher, load_footprints
+from roi_inference import RoiInference
 
 class PCBDetectionApp:
     def __init__(self, root):
@@ -28,10 +45,21 @@ class PCBDetectionApp:
 
         self.root.geometry(f"{window_width}x{window_height}+{position_x}+{position_y}")
 
-        self.model = YOLO("c:/Users/syahla/Downloads/2_runs_merging_yolov8_100/content/runs/detect/train/weights/best.pt")
+        # Backend inferensi (torch / onnx / openvino) dipilih lewat PCB_QC_BACKEND,
+        # PCB_QC_SERVER=host:port -> pakai model di inference_server.py (thin client).
+        # Tanpa server, YOLO jalan di proses worker sendiri supaya tidak berebut GIL dengan Tk
+        self.model = load_model("c:/Users/syahla/Downloads/2_runs_merging_yolov8_100/content/runs/detect/train/weights/best.pt",
+                                separate_process=True)
         self.CONF_THRESHOLD = 0.64
+        # Sifat setiap class (defect, OCR, warna, label) dihitung sekali dari model.names
+        self.taxonomy = get_taxonomy(self.model.names)
+        # Model jalan dengan conf rendah, deteksi lemah hanya dipakai untuk
+        # melanjutkan track yang sudah ada (asosiasi dua tahap)
+        self.TRACK_LOW_CONF = 0.3
+        self.tracker = ComponentTracker(high_conf=self.CONF_THRESHOLD, low_conf=self.TRACK_LOW_CONF)
 
         self.cap = None
+        self.grabber = None
         self.is_running = False
         self.is_recording = False
         self.out = None
@@ -39,10 +67,36 @@ class PCBDetectionApp:
         self.system = platform.system()
         self.fps = 0.0
         self.prev_time = time.time()
+        self.frame_latency = 0.0
+        # Frame terakhir untuk GUI; ditulis thread deteksi, ditampilkan refresh_display (main thread)
+        self.DISPLAY_INTERVAL_MS = 16  # ~60 Hz
+        self.STATS_INTERVAL = 0.1
+        self.display_frame = None
+        self.display_seq = 0
+        self.shown_seq = 0
+        self.display_size = (0, 0)
+        self.last_stats_time = 0.0
+        self.photo = None
+        # Buffer anotasi & tampilan dipakai ulang; serah-terima antar thread lewat refcount
+        self.annotated_pool = FramePool("annotated")
+        self.display_pool = FramePool("display")
+        self.frame_lock = threading.Lock()
+        self.current_frame = None
+        self.quality_gate = FrameQualityGate()
+        self.scene_detector = SceneChangeDetector()
+        self.last_draw_items = []
 
         # Initialize OCR
         self.resistor_ocr = resistor_OCR()
-        self.ocr_results = {}
+        self.ocr_cache = OCRCache()
+        # OCR jalan di worker terpisah, mode "thread" atau "process"
+        self.OCR_WORKERS = 1
+        self.OCR_MODE = "thread"
+        # Crop resistor yang sudah terbaca benar (converged & cocok expected) disimpan di sini
+        # sebagai data fit template digit: python scripts/fit_digit_templates.py ocr_crops.
+        # None = tidak mengumpulkan crop
+        self.OCR_CROP_DIR = "ocr_crops"
+        self.ocr_pool = None
 
         self.current_area = None
         self.current_area_mode = False  # TAMBAH ini
@@ -58,6 +112,27 @@ class PCBDetectionApp:
         }
         
         self.max_count = defaultdict(int)  # For current frame
+        # Jumlah komponen dari beberapa frame terakhir, dipakai untuk capture & panel stats
+        self.count_window = CountWindow(len(self.taxonomy))
+        self.stable_count = {}
+        self.count_stability = 0.0
+        self.count_frames = 0
+        # Jumlah per class frame terakhir yang diinferensi, dipakai ulang saat board diam
+        self.last_counts = None
+        self.auto_capture = AutoCapture()
+        self.auto_capture_enabled = False
+        # Kenali area dari gambar referensi (area_references/<Area N>/*.png)
+        self.area_recognizer = AreaRecognizer()
+        self.auto_area_enabled = False
+        # Homography frame -> golden image area (area_references/<Area N>/golden.png)
+        self.registration = BoardRegistration()
+        # Posisi footprint per area di koordinat golden (footprints.json)
+        self.footprints = load_footprints()
+        self.footprint_matchers = {}
+        self.last_position_validation = None
+        # Area terpilih & teregistrasi -> YOLO hanya di crop area dengan imgsz lebih kecil
+        self.roi_inference = RoiInference()
+        self.AREAS = ["Area 1", "Area 2", "Area 3", "Area 4", "Area 5", "Area 6", "Area 7"]
         self.camera_devices = {}
         self.init_camera()
         self.setup_gui()
@@ -163,6 +238,19 @@ class PCBDetectionApp:
                                         state=tk.DISABLED)
         self.button_capture_area.pack(fill=tk.X, pady=5)
 
+        # Auto capture: capture sendiri setelah hasil stabil, lalu lanjut ke area berikutnya
+        self.auto_capture_var = tk.BooleanVar(value=False)
+        self.check_auto_capture = ttk.Checkbutton(area_frame, text="Auto capture & next area",
+                                                  variable=self.auto_capture_var,
+                                                  command=self.toggle_auto_capture)
+        self.check_auto_capture.pack(fill=tk.X, pady=5)
+
+        self.auto_area_var = tk.BooleanVar(value=False)
+        self.check_auto_area = ttk.Checkbutton(area_frame, text="Recognize area automatically",
+                                               variable=self.auto_area_var,
+                                               command=self.toggle_auto_area)
+        self.check_auto_area.pack(fill=tk.X, pady=5)
+
         # Separator
         ttk.Separator(area_frame, orient='horizontal').pack(fill=tk.X, pady=10)
         
@@ -248,6 +336,12 @@ class PCBDetectionApp:
 
         self.current_area = area_name
         self.current_area_mode = True
+        self.auto_capture.start_area(area_name)
+        self.ocr_cache.set_area(area_name)
+        self.scene_detector.force_refresh()
+        self.tracker.reset()
+        self.count_window.reset()
+        self.last_counts = None
 
         # Update button states - highlight yang dipilih
         for area, button in self.area_buttons.items():
@@ -279,14 +373,17 @@ class PCBDetectionApp:
             messagebox.showwarning("Warning", "Please start the camera first!")
             return
 
-        if not self.max_count:
-            messagebox.showwarning("Warning", "No components detected in current frame!")
+        if not self.stable_count:
+            messagebox.showwarning("Warning", "No components detected in recent frames!")
             return
 
         area_name = self.current_area
 
-        # Simpan data deteksi saat ini ke area
-        self.area_data[area_name]["components"] = dict(self.max_count.copy())
+        # Simpan jumlah komponen hasil agregasi beberapa frame terakhir ke area
+        self.area_data[area_name]["components"] = dict(self.stable_count)
+        self.area_data[area_name]["stability"] = self.count_stability
+        self.area_data[area_name]["duration"] = self.auto_capture.finish_area(area_name)
+        self.area_data[area_name]["positions"] = self.last_position_validation
         self.area_data[area_name]["captured"] = True
         self.area_data[area_name]["timestamp"] = datetime.now().strftime("%H:%M:%S")
 
@@ -340,6 +437,45 @@ class PCBDetectionApp:
     #     # Reset setelah 1 detik
     #     self.root.after(1000, lambda: self.area_buttons[area_name].state(['!pressed']))
     
+    def get_footprint_matcher(self, area_name):
+        if area_name not in self.footprints:
+            return None
+        if area_name not in self.footprint_matchers:
+            self.footprint_matchers[area_name] = FootprintMatcher(
+                self.footprints[area_name], self.resistor_ocr.designator_markings(area_name))
+        return self.footprint_matchers[area_name]
+
+    def toggle_auto_capture(self):
+        # Disalin ke atribut biasa supaya thread deteksi tidak membaca variabel Tk
+        self.auto_capture_enabled = self.auto_capture_var.get()
+
+    def toggle_auto_area(self):
+        enabled = self.auto_area_var.get()
+        if enabled and not self.area_recognizer.is_ready and not self.area_recognizer.load():
+            messagebox.showwarning("Warning", f"No reference images found in {self.area_recognizer.reference_dir}/<Area N>/")
+            self.auto_area_var.set(False)
+            enabled = False
+        self.area_recognizer.reset()
+        self.auto_area_enabled = enabled
+
+    def auto_capture_area(self, area_name):
+        """Dipanggil di thread GUI: capture area yang stabil lalu pindah ke area berikutnya"""
+        if area_name != self.current_area or not self.is_running:
+            return
+        self.capture_area_data()
+
+        start = self.AREAS.index(area_name)
+        remaining = [a for a in self.AREAS[start + 1:] + self.AREAS[:start] if not self.area_data[a]["captured"]]
+        duration = self.area_data[area_name].get("duration")
+        took = f" in {duration:.1f}s" if duration is not None else ""
+        if remaining:
+            self.select_area(remaining[0])
+            self.status_label.config(text=f"🤖 {area_name} auto-captured{took} - now inspecting {remaining[0]}")
+        else:
+            stats = self.auto_capture.get_stats()
+            self.status_label.config(text=f"🤖 {area_name} auto-captured{took} - all areas done "
+                                          f"({stats['total_time']:.1f}s total)")
+
     def reset_all_areas(self):
         """Reset semua data area"""
         confirm = messagebox.askyesno("Confirm Reset", 
@@ -356,6 +492,12 @@ class PCBDetectionApp:
         self.current_area = None
         self.current_area_mode = False  # TAMBAH ini
         self.last_validation = None     # TAMBAH ini
+        self.auto_capture.start_area(None)
+        self.ocr_cache.set_area(None)
+        self.scene_detector.force_refresh()
+        self.tracker.reset()
+        self.count_window.reset()
+        self.last_counts = None
         self.button_summary.config(state=tk.DISABLED)
         self.button_capture_area.config(state=tk.DISABLED)  # TAMBAH ini
 
@@ -423,6 +565,13 @@ class PCBDetectionApp:
             
             if data["captured"]:
                 report += f"Captured at: {data['timestamp']}\n"
+                if data.get("duration") is not None:
+                    report += f"Inspection time: {data['duration']:.1f}s\n"
+                if data.get("positions"):
+                    report += f"Footprints: {data['positions']['message']}\n"
+                    for item in data["positions"]["designators"]:
+                        marking = f" [{item['marking']}]" if item["marking"] else ""
+                        report += f"  {item['designator']:<6} {item['component']:<12} {item['status']}{marking}\n"
                 report += f"Status: ✅ INSPECTED\n\n"
                 
                 if data["components"]:
@@ -430,15 +579,7 @@ class PCBDetectionApp:
                     report += "-" * 70 + "\n"
                     
                     # Pisahkan OK dan Defect
-                    ok_components = {}
-                    incomplete_components = {}
-                    
-                    for cls_id, count in data["components"].items():
-                        class_name = self.model.names[cls_id]
-                        if any(incomplete in class_name for incomplete in ["No "]):
-                            incomplete_components[class_name] = count
-                        else:
-                            ok_components[class_name] = count
+                    ok_components, incomplete_components = self.taxonomy.split_missing(data["components"])
                     
                     # Display OK components
                     if ok_components:
@@ -471,6 +612,10 @@ class PCBDetectionApp:
         
         total_areas_inspected = sum(1 for data in self.area_data.values() if data["captured"])
         report += f"Areas Inspected: {total_areas_inspected}/7\n"
+        timing = self.auto_capture.get_stats()
+        if timing["areas_timed"]:
+            report += f"Inspection Time: {timing['total_time']:.1f}s total, {timing['mean_area_time']:.1f}s per area"
+            report += f" ({timing['auto_captures']} auto-captured)\n"
         
         # Aggregate all components
         all_components = defaultdict(int)
@@ -481,8 +626,7 @@ class PCBDetectionApp:
         
         if all_components:
             total_all = sum(all_components.values())
-            defects_all = sum(count for cls_id, count in all_components.items() 
-                            if any(defect in self.model.names[cls_id] for defect in ["No ", "wrong", "Missalignment"]))
+            defects_all = self.taxonomy.count_defects(all_components)
             
             report += f"Total Components Detected: {total_all}\n"
             report += f"Total Defects: {defects_all}\n"
@@ -518,17 +662,18 @@ class PCBDetectionApp:
             data = self.area_data[area]
             
             if data["captured"]:
-                summary += f"✅ {area} (at {data['timestamp']})\n"
+                duration = data.get("duration")
+                took = f", {duration:.1f}s" if duration is not None else ""
+                summary += f"✅ {area} (at {data['timestamp']}{took})\n"
                 
                 if data["components"]:
-                    defects = sum(count for cls_id, count in data["components"].items() 
-                                if any(d in self.model.names[cls_id] for d in ["No ", "wrong", "Missalignment"]))
+                    defects = self.taxonomy.count_defects(data["components"])
                     total = sum(data["components"].values())
                     
                     summary += f"   Components: {total} | Defects: {defects}\n"
                     sorted_components = sorted(data["components"].items(), key=lambda x: x[1], reverse=True)[:3]
                     for cls_id, count in sorted_components:
-                        summary += f"   • {self.model.names[cls_id]}: {count}\n"
+                        summary += f"   • {self.taxonomy.label[cls_id]}: {count}\n"
                 else:
                     summary += "   No components detected\n"
                 summary += "\n"
@@ -558,6 +703,17 @@ class PCBDetectionApp:
                 self.status_label.config(text=f"Failed to open camera {camera_index} with all methods")
                 return
 
+        # Buffer driver sekecil mungkin, frame terbaru diambil lewat grabber
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self.grabber = FrameGrabber(self.cap)
+        self.grabber.start()
+        self.tracker.reset()
+        self.count_window.reset()
+        self.last_counts = None
+
+        self.ocr_pool = OCRWorkerPool(self.resistor_ocr, num_workers=self.OCR_WORKERS, mode=self.OCR_MODE)
+        self.ocr_pool.start()
+
         self.is_running = True
         self.button_start.config(state=tk.DISABLED)
         self.button_stop.config(state=tk.NORMAL)
@@ -565,10 +721,11 @@ class PCBDetectionApp:
         self.button_capture.config(state=tk.NORMAL)
         self.camera_dropdown.config(state=tk.DISABLED)
         self.button_refresh.config(state=tk.DISABLED)
-        self.status_label.config(text=f"Camera {camera_index} started - Click area buttons to capture data")
+        self.status_label.config(text=f"Camera {camera_index} started ({self.model.backend}) - Click area buttons to capture data")
         
         self.video_thread = threading.Thread(target=self.main_detection, daemon=True)
         self.video_thread.start()
+        self.refresh_display()
     
     def stop_camera(self):
         self.is_running = False
@@ -576,6 +733,14 @@ class PCBDetectionApp:
         if self.is_recording:
             self.stop_recording()
         
+        if self.grabber is not None:
+            self.grabber.stop()
+            self.grabber = None
+
+        if self.ocr_pool is not None:
+            self.ocr_pool.stop()
+            self.ocr_pool = None
+
         if self.cap is not None:
             self.cap.release()
             self.cap = None
@@ -595,11 +760,11 @@ class PCBDetectionApp:
             self.stop_recording()
     
     def start_recording(self):
-        if self.cap is None or not self.cap.isOpened():
+        if self.cap is None or not self.cap.isOpened() or self.grabber is None:
             return
         
-        ret, test_frame = self.cap.read()
-        if not ret:
+        test_frame = self.grabber.latest()
+        if test_frame is None:
             self.status_label.config(text="Cannot read frame for recording")
             return
         
@@ -645,57 +810,189 @@ class PCBDetectionApp:
         self.status_label.config(text=f"Recording saved: {self.filename}")
     
     def capture_frame(self):
-        if hasattr(self, 'current_frame') and self.current_frame is not None:
+        # Pegang buffer selama imwrite supaya tidak dipakai ulang thread deteksi
+        with self.frame_lock:
+            current = self.current_frame.retain() if self.current_frame is not None else None
+        if current is not None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"capture_{timestamp}.png"
-            cv2.imwrite(filename, self.current_frame)
+            try:
+                cv2.imwrite(filename, current.array)
+            finally:
+                current.release()
             self.status_label.config(text=f"Captured: {filename}")
     
+    def collect_ocr_results(self):
+        """Simpan hasil OCR yang sudah selesai dari worker ke cache"""
+        if self.ocr_pool is None:
+            return
+
+        for res in self.ocr_pool.pop_results():
+            if not res["marking"]:
+                continue
+
+            # Gabungkan dengan bacaan frame sebelumnya untuk resistor yang sama
+            entry = self.ocr_cache.get_key(res["key"])
+            consensus = entry["consensus"] if entry else MarkingConsensus()
+            # Vote pakai marking yang sudah dicocokkan ke daftar expected area
+            read_marking = res["marking"]
+            index = self.resistor_ocr.marking_index.get(res["area"])
+            if index is not None:
+                matched, _ = index.match(read_marking)
+                read_marking = matched or read_marking
+            consensus.add(read_marking, res["confidence"])
+            marking, share, mean_conf = consensus.best()
+
+            validation = self.resistor_ocr.validate_resistor(res["area"], marking)
+            if self.OCR_CROP_DIR and consensus.converged and validation["match"] and read_marking == marking:
+                self.save_ocr_crop(res["roi"], marking)
+
+            self.ocr_cache.put(res["key"], res["bbox"], {
+                "marking": marking,
+                "validation": validation,
+                "confidence": mean_conf,
+                "share": share,
+                "reads": len(consensus.reads),
+                "consensus": consensus,
+                "converged": consensus.converged,
+            })
+
+    def save_ocr_crop(self, roi, marking):
+        os.makedirs(self.OCR_CROP_DIR, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        cv2.imwrite(os.path.join(self.OCR_CROP_DIR, f"{marking}_{timestamp}.png"), roi)
+
+    def show_frame(self, annotated_buf, frame_time):
+        """
+        Simpan, rekam, dan kirim frame hasil anotasi ke GUI.
+        annotated_buf (FrameBuffer) diserahkan ke sini, tidak perlu di-release pemanggil.
+        """
+        annotated = annotated_buf.array
+        if self.is_recording and self.out is not None:
+            self.out.write(annotated)
+
+        # Ukuran label dibaca main thread (refresh_display), Tk tidak dipanggil dari sini
+        label_w, label_h = self.display_size
+        h, w = annotated.shape[:2]
+        if label_w > 1 and label_h > 1:
+            scale = min(label_w / w, label_h / h)
+            new_w = int(w * scale)
+            new_h = int(h * scale)
+            # Resize dulu baru konversi warna in-place di buffer yang lebih kecil
+            display = self.display_pool.acquire((new_h, new_w, 3))
+            cv2.resize(annotated, (new_w, new_h), dst=display.array)
+            cv2.cvtColor(display.array, cv2.COLOR_BGR2RGB, dst=display.array)
+        else:
+            display = self.display_pool.acquire(annotated.shape)
+            cv2.cvtColor(annotated, cv2.COLOR_BGR2RGB, dst=display.array)
+        
+        # Umur frame dari kamera sampai siap ditampilkan
+        self.frame_latency = time.time() - frame_time
+        # Frame untuk tombol Capture cukup dipegang, tidak di-copy
+        with self.frame_lock:
+            previous_current, self.current_frame = self.current_frame, annotated_buf
+            previous_display, self.display_frame = self.display_frame, display
+            self.display_seq += 1
+        if previous_current is not None:
+            previous_current.release()
+        if previous_display is not None:
+            previous_display.release()
+
     def main_detection(self):
+        last_seq = 0
         while self.is_running:
             start_time = time.time()
             current_time = time.time()
             self.fps = 1.0 / (current_time - self.prev_time)
             self.prev_time = current_time
 
-            if self.cap is None or not self.cap.isOpened():
+            grabber = self.grabber
+            if grabber is None or self.cap is None or not self.cap.isOpened():
                 break
             
-            ret, frame = self.cap.read()
+            # Selalu ambil frame terbaru, frame yang tertinggal sudah di-drop oleh grabber
+            ret, frame, last_seq, frame_time = grabber.read(last_seq)
             if not ret:
-                self.root.after(0, lambda: self.status_label.config(text="Cannot read frame"))
-                break
+                if grabber.failed:
+                    self.root.after(0, lambda: self.status_label.config(text="Cannot read frame"))
+                    break
+                continue
+
+            self.collect_ocr_results()
+
+            # Frame blur / gelap / over-exposed tidak masuk YOLO dan OCR,
+            # hasil deteksi terakhir yang layak tetap dipakai
+            quality_ok, quality_reason, _ = self.quality_gate.check(frame)
+            if not quality_ok:
+                annotated_buf = self.annotated_pool.copy_from(frame)
+                self.draw_last_items(annotated_buf.array)
+                cv2.putText(annotated_buf.array, f"Skipped: {quality_reason}", (10, 30),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 165, 255), 2)
+                self.show_frame(annotated_buf, frame_time)
+                continue
 
-            results = self.model(frame, conf=self.CONF_THRESHOLD, verbose=False)
-            result = results[0]
+            # Board diam -> pakai ulang deteksi & validasi frame sebelumnya
+            if not self.scene_detector.should_process(frame):
+                # Deteksi yang dipakai ulang tetap masuk window, supaya board diam
+                # tetap mengisi window dan bisa di-auto-capture
+                if self.last_counts is not None:
+                    self.update_counts(self.last_counts)
+                annotated_buf = self.annotated_pool.copy_from(frame)
+                self.draw_last_items(annotated_buf.array)
+                self.show_frame(annotated_buf, frame_time)
+                self.wait_frame_interval(start_time)
+                continue
+
+            # Scene berubah -> cek apakah kamera sekarang melihat area lain
+            if self.auto_area_enabled:
+                area = self.area_recognizer.update(frame)
+                if area is not None and area != self.current_area and area in self.area_data:
+                    self.area_recognizer.reset()
+                    self.root.after(0, self.select_area, area)
+
+            # Board digeser -> hasil OCR lama dan jumlah frame sebelumnya tidak berlaku lagi
+            if self.ocr_cache.check_board(frame):
+                self.count_window.reset()
+
+            # Sejajarkan frame ke golden image area, diestimasi ulang hanya kalau board bergerak
+            if self.current_area_mode and self.current_area:
+                self.registration.update(self.current_area, frame)
+
+            # Satu kali ambil array dari tensor, tidak ada loop per box;
+            # box dari crop ROI sudah dikembalikan ke koordinat frame
+            roi_rect = None
+            if self.current_area_mode and self.current_area:
+                roi_rect = self.roi_inference.select(frame.shape, self.current_area, self.registration)
+            xyxy, confs, classes = self.roi_inference.predict(self.model, frame, roi_rect, self.TRACK_LOW_CONF)
+
+            # Deteksi -> track; hanya track confirmed (komponen fisik yang stabil)
+            # yang dihitung, digambar, dan di-OCR
+            tracks = self.tracker.update(xyxy, confs, classes)
+            xyxy, confs, classes, track_ids = self.tracker.to_arrays(tracks)
             
             if self.current_area_mode and self.current_area:
-                filtered_boxes, validation = filter_detections(self.current_area, result.boxes, self.model)
-                self.last_validation = validation
-                boxes_to_process = filtered_boxes
+                keep, _ = filter_detections(self.current_area, (xyxy, confs, classes), self.model)
             else:
-                boxes_to_process = result.boxes
-                self.last_validation = None
-            
-            best_boxes = {}
-            for box in boxes_to_process:
-                cls_id = int(box.cls[0])
-                conf = float(box.conf[0])
-                if cls_id not in best_boxes or conf >= best_boxes[cls_id]['conf']:
-                    best_boxes[cls_id] = {'conf': conf, 'box': box}
+                keep = np.arange(len(classes))
+
+            self.last_counts = np.bincount(classes[keep], minlength=len(self.taxonomy))
+            self.update_counts(self.last_counts)
             
             # Reset max_count untuk frame saat ini
             self.max_count = defaultdict(int)
-            annotated = frame.copy()
+            annotated_buf = self.annotated_pool.copy_from(frame)
+            annotated = annotated_buf.array
+            ocr_jobs = []
+            draw_items = []
+            frame_markings = {}
             
-            for cls_id, data in best_boxes.items():
-                self.max_count[cls_id] = 1
-                box = data['box']
-                x1, y1, x2, y2 = map(int, box.xyxy[0])
-                conf = data['conf']
-                class_name = self.model.names[cls_id]
-                label = f"{class_name}:{conf:.2f}"
-                color = (0, 255, 0) 
+            for i in keep:
+                cls_id = int(classes[i])
+                self.max_count[cls_id] += 1
+                x1, y1, x2, y2 = xyxy[i].astype(int).tolist()
+                conf = float(confs[i])
+                label = f"#{track_ids[i]} {self.taxonomy.label[cls_id]}:{conf:.2f}"
+                color = self.taxonomy.color[cls_id]
                 
                 # if label.startswith("No capacitor") or label.startswith("wrong component") or label.startswith("No jackcable"):
                 #     cv2.rectangle(annotated, (x1, y1), (x2, y2), (0, 0, 255), 2)
@@ -711,17 +1008,28 @@ class PCBDetectionApp:
                 #     cv2.putText(annotated, label, (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
 
                 # OCR buat resistor
-                if "Resistor" in class_name and "No resistor" not in class_name:
+                if self.taxonomy.needs_ocr[cls_id]:
                     bbox = [x1, y1, x2, y2]
-                    marking, ocr_conf = self.resistor_ocr.read_classify_resistor(bbox,frame)
-                    if marking and self.current_area:
-                        validation = self.resistor_ocr.validate_resistor(self.current_area, marking)
-                        if ocr_conf > 0.5:
-                            self.ocr_results[f"{cls_id}_{x1}_{y1}"]={
-                                "marking":marking,
-                                "validation":validation,
-                                "confidence":ocr_conf
-                            }
+                    # Hasil OCR & voting per track (komponen fisik), bukan per posisi
+                    track_id = int(track_ids[i])
+                    ocr_data = None
+                    if self.current_area:
+                        ocr_data = self.ocr_cache.get(self.current_area, cls_id, bbox, track_id)
+
+                    # Resistor belum converged -> kirim ke worker, deteksi jalan terus
+                    needs_ocr = ocr_data is None or not ocr_data["converged"]
+                    if needs_ocr and self.current_area and self.ocr_pool is not None:
+                        roi = self.resistor_ocr.crop_resistor_roi(bbox, frame)
+                        if self.quality_gate.check_roi(roi):
+                            if ocr_data is not None:
+                                ocr_key = ocr_data["key"]
+                            else:
+                                ocr_key = self.ocr_cache.make_key(self.current_area, cls_id, bbox, track_id)
+                            ocr_jobs.append((ocr_key, roi, bbox, self.current_area, last_seq))
+
+                    if ocr_data and self.current_area:
+                        frame_markings[i] = ocr_data["marking"]
+                        validation = ocr_data["validation"]
                         decoded = validation.get("decoded")
                         if decoded:
                             label = f"{label}: marking ({decoded['value_str']}){conf:.2f}"
@@ -738,77 +1046,173 @@ class PCBDetectionApp:
                 # elif "No resistor" in class_name:
                     # color = (0,0,255)
                 
-                if any(incomplete in label for incomplete in ["No "]):
-                    # cv2.rectangle(annotated, (x1, y1), (x2, y2), (0, 0, 255), 2)
-                    # cv2.putText(annotated, label, (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 2)
-                    color = (0,0,255)
-                else: 
-                    color = (0,255,0)
+                color = self.taxonomy.color[cls_id]
                 cv2.rectangle(annotated, (x1, y1), (x2, y2), color, 2)
                 cv2.putText(annotated, label, (x1, y1 -10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+                draw_items.append((x1, y1, x2, y2, label, color))
             # else:
             #         cv2.rectangle(annotated, (x1, y1), (x2, y2), (0, 255, 0), 2)
             #         cv2.putText(annotated, label, (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
             
-            self.current_frame = annotated.copy()
-            
-            if self.is_recording and self.out is not None:
-                self.out.write(annotated)
+            # Deteksi -> koordinat golden -> status per designator
+            self.last_position_validation = None
+            matcher = self.get_footprint_matcher(self.current_area) if self.current_area_mode else None
+            if matcher is not None and self.registration.area == self.current_area and len(keep):
+                kept_cls = classes[keep]
+                centers = np.column_stack([(xyxy[keep, 0] + xyxy[keep, 2]) / 2, (xyxy[keep, 1] + xyxy[keep, 3]) / 2])
+                golden_points = self.registration.to_golden(centers)
+                if golden_points is not None:
+                    self.last_position_validation = matcher.validate(
+                        self.current_area, golden_points,
+                        [self.taxonomy.base_component[c] for c in kept_cls],
+                        self.taxonomy.is_missing[kept_cls],
+                        {n: frame_markings[i] for n, i in enumerate(keep) if i in frame_markings})
 
-            frame_rgb = cv2.cvtColor(annotated, cv2.COLOR_BGR2RGB)
-            label_w = self.video_label.winfo_width()
-            label_h = self.video_label.winfo_height()
+            # Semua resistor dari frame ini dibaca worker dalam satu batch
+            if ocr_jobs:
+                self.ocr_pool.submit_batch(ocr_jobs)
 
-            if label_w > 1 and label_h > 1:
-                h, w = frame_rgb.shape[:2]
-                scale = min(label_w / w, label_h / h)
+            self.roi_inference.draw(annotated)
+            self.last_draw_items = draw_items
+            self.show_frame(annotated_buf, frame_time)
+            self.wait_frame_interval(start_time)
 
-                new_w = int(w * scale)
-                new_h = int(h * scale)
+    def update_counts(self, counts):
+        """
+        Jumlah per class satu frame masuk window; validasi, capture, dan panel
+        stats pakai modus window supaya satu frame yang miss tidak membalik hasil
+        """
+        self.count_window.add(counts)
+        stable, self.count_stability, self.count_frames = self.count_window.summary()
+        self.stable_count = {int(c): int(stable[c]) for c in np.flatnonzero(stable)}
+        if self.current_area_mode and self.current_area:
+            self.last_validation = validate_counts(self.current_area, stable, self.model)
+            if self.auto_capture_enabled and self.auto_capture.update(
+                    self.stable_count, self.last_validation, self.count_stability, self.count_frames):
+                self.root.after(0, self.auto_capture_area, self.current_area)
+        else:
+            self.last_validation = None
 
-                frame_resized = cv2.resize(frame_rgb, (new_w, new_h))
-            else:
-                frame_resized = frame_rgb
-            
-            img = Image.fromarray(frame_resized)
-            imgtk = ImageTk.PhotoImage(image=img)
-            
-            self.root.after(0, self.update_gui, imgtk)
-            
-            elapsed = time.time() - start_time
-            target_fps = 30
-            delay = max(0, (1.0 / target_fps) - elapsed)
-            if delay > 0:
-                time.sleep(delay)
+    def draw_last_items(self, annotated):
+        """Gambar ulang box dari frame terakhir yang diinferensi"""
+        for x1, y1, x2, y2, label, color in self.last_draw_items:
+            cv2.rectangle(annotated, (x1, y1), (x2, y2), color, 2)
+            cv2.putText(annotated, label, (x1, y1 -10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+
+    def wait_frame_interval(self, start_time, target_fps=30):
+        elapsed = time.time() - start_time
+        delay = max(0, (1.0 / target_fps) - elapsed)
+        if delay > 0:
+            time.sleep(delay)
     
-    def update_gui(self, imgtk):
-        if self.is_running:
-            self.video_label.imgtk = imgtk
-            self.video_label.configure(image=imgtk)
-            self.fps_label.config(text=f"FPS: {self.fps:.1f}")
+    def refresh_display(self):
+        """
+        Loop GUI ~60 Hz di main thread, terpisah dari kecepatan deteksi.
+        Gambar hanya diganti kalau ada frame baru; panel stats tiap STATS_INTERVAL.
+        """
+        if not self.is_running:
+            return
+        self.display_size = (self.video_label.winfo_width(), self.video_label.winfo_height())
+
+        with self.frame_lock:
+            display = None
+            if self.display_seq != self.shown_seq and self.display_frame is not None:
+                self.shown_seq = self.display_seq
+                display = self.display_frame.retain()
+        if display is not None:
+            try:
+                img = Image.fromarray(display.array)
+            finally:
+                display.release()
+            # PhotoImage yang sama dipakai ulang selama ukuran tampilan tidak berubah
+            if self.photo is not None and (self.photo.width(), self.photo.height()) == img.size:
+                self.photo.paste(img)
+            else:
+                self.photo = ImageTk.PhotoImage(image=img)
+                self.video_label.imgtk = self.photo
+                self.video_label.configure(image=self.photo)
+
+        now = time.time()
+        if now - self.last_stats_time >= self.STATS_INTERVAL:
+            self.last_stats_time = now
+            fps_text = f"FPS: {self.fps:.1f}"
+            if self.grabber is not None:
+                stats = self.grabber.get_stats()
+                fps_text += f" | Dropped: {stats['dropped']} | Lag: {self.frame_latency * 1000:.0f} ms"
+            if getattr(self.model, "last_roundtrip", 0.0):
+                fps_text += f" | Infer: {self.model.last_roundtrip * 1000:.0f} ms"
+            fps_text += f" | {self.format_allocation_rate()}"
+            self.fps_label.config(text=fps_text)
             self.update_stats()
+
+        self.root.after(self.DISPLAY_INTERVAL_MS, self.refresh_display)
     
+    def format_allocation_rate(self):
+        """Alokasi frame baru vs buffer yang dipakai ulang (MB/s) dari semua pool"""
+        pools = [self.annotated_pool, self.display_pool]
+        if self.grabber is not None:
+            pools.append(self.grabber.pool)
+        stats = [pool.get_stats() for pool in pools]
+        alloc = sum(s["alloc_mb_s"] for s in stats)
+        reused = sum(s["reuse_mb_s"] for s in stats)
+        return f"Alloc: {alloc:.1f} MB/s (reused {reused:.0f} MB/s)"
+
     def update_stats(self):
         stats_str = "=== Current Frame Detection ===\n"
 
+        quality_stats = self.quality_gate.get_stats()
+        if quality_stats["frames_skipped"] or quality_stats["rois_skipped"]:
+            skipped = ", ".join(f"{k}: {v}" for k, v in quality_stats["skipped"].items() if v)
+            stats_str += f"Skipped frames: {quality_stats['frames_skipped']} ({skipped or '-'})"
+            stats_str += f" | OCR ROI skipped: {quality_stats['rois_skipped']}\n"
+        scene_stats = self.scene_detector.get_stats()
+        if scene_stats["reused"]:
+            stats_str += f"Static scene: {scene_stats['reused']} frames reused ({scene_stats['reuse_rate'] * 100:.0f}%)\n"
+
         if self.current_area_mode and self.current_area:
             stats_str += f"🎯 Inspecting: {self.current_area}\n"
             stats_str += f"{'─' * 35}\n\n"
 
             # ocr result
-            if self.ocr_results:
+            ocr_entries = self.ocr_cache.values()
+            if ocr_entries:
                 stats_str += "Resistor results:\n"
-                for cls_id, ocr_data in self.ocr_results.items():
+                for ocr_data in ocr_entries:
                     val = ocr_data["validation"]
                     stats_str +=f"{val['message']}\n"
-                    stats_str += f"  Confidence: {ocr_data['confidence']:.2f}\n"
+                    state = "locked" if ocr_data["converged"] else "voting"
+                    stats_str += f"  Confidence: {ocr_data['confidence']:.2f} | {state} {ocr_data['share'] * 100:.0f}% of {ocr_data['reads']} reads\n"
                     if val.get("designator"):
                         stats_str += f"  Position: {val['designator']}\n"
                     stats_str += "\n"
+            if self.ocr_pool is not None:
+                ocr_stats = self.ocr_pool.get_stats()
+                cache_stats = self.ocr_cache.get_stats()
+                stats_str += f"OCR queue: {ocr_stats['queued']} | done: {ocr_stats['completed']} | dropped: {ocr_stats['dropped_full'] + ocr_stats['dropped_stale']}\n"
+                stats_str += f"OCR cache: hit {cache_stats['hits']} / miss {cache_stats['misses']} ({cache_stats['hit_rate'] * 100:.0f}%)\n\n"
             # Tampilkan hasil validasi jika ada
             if self.last_validation:
                 val = self.last_validation
-                stats_str += f"{val['message']}\n\n"
+                stats_str += f"{val['message']}\n"
+                stats_str += f"Stability: {self.count_stability * 100:.0f}% of recent frames\n"
+                reg_stats = self.registration.get_stats()
+                if reg_stats["area"] == self.current_area:
+                    if reg_stats["registered"]:
+                        stats_str += f"Registered to golden: {reg_stats['inliers']} inliers ({reg_stats['last_ms']:.1f} ms)\n"
+                    else:
+                        stats_str += "Registered to golden: no match\n"
+                if self.roi_inference.last_rect is not None:
+                    roi_stats = self.roi_inference.get_stats()
+                    stats_str += f"ROI inference: {roi_stats['mean_fraction'] * 100:.0f}% of frame at imgsz {self.roi_inference.imgsz}\n"
+                if self.last_position_validation:
+                    positions = self.last_position_validation
+                    stats_str += f"{positions['message']}\n"
+                    for item in positions["designators"]:
+                        if item["status"] != "present":
+                            stats_str += f"  • {item['designator']} ({item['component']}): {item['status']}\n"
+                if self.auto_capture_enabled:
+                    stats_str += f"Auto capture: {self.auto_capture.dwell_progress() * 100:.0f}%\n"
+                stats_str += "\n"
 
                 if val.get('missing'):
                     stats_str += "⚠️ Missing Components:\n"
@@ -830,16 +1234,8 @@ class PCBDetectionApp:
 
                 stats_str += "\n💡 Click 'Capture Current Area' to save"
 
-        elif self.max_count:
-            full_components = {}
-            incomplete_area = {}
-
-            for cls_id, cnt in self.max_count.items():
-                class_name = self.model.names[cls_id]
-                if any(incomplete in class_name for incomplete in ["No "]):
-                    incomplete_area[class_name] = cnt
-                else:
-                    full_components[class_name] = cnt
+        elif self.stable_count:
+            full_components, incomplete_area = self.taxonomy.split_missing(self.stable_count)
 
             if full_components:
                 stats_str += "✅ OK Components:\n"
@@ -853,7 +1249,7 @@ class PCBDetectionApp:
                     stats_str += f"  • {name}: {cnt}\n"
                 stats_str += "\n"
 
-            total = sum(self.max_count.values())
+            total = sum(self.stable_count.values())
             defects = sum(incomplete_area.values())
             stats_str += f"{'─' * 35}\n"
             stats_str += f"Total: {total} | Defects: {defects}\n"
@@ -870,6 +1266,8 @@ class PCBDetectionApp:
     
     def on_closing(self):
         self.stop_camera()
+        if hasattr(self.model, "close"):
+            self.model.close()
         self.root.destroy()
 
 def main():
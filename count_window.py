@@ -0,0 +1,59 @@
+import time
+
+import numpy as np
+
+
+class CountWindow:
+    """
+    Jumlah komponen per class dari beberapa frame terakhir.
+
+    Disimpan di ring buffer numpy ukuran tetap (`window` frame x n_classes),
+    jadi add() O(1) tanpa alokasi. Baris yang umurnya lebih dari `max_age`
+    detik tidak ikut dihitung. Hasil agregat = modus jumlah per class, plus
+    stability = fraksi frame yang vektor jumlahnya sama persis dengan modus.
+    """
+    def __init__(self, n_classes, window=30, max_age=5.0):
+        self.n_classes = n_classes
+        self.window = window
+        self.max_age = max_age
+
+        self.counts = np.zeros((window, n_classes), dtype=np.int32)
+        self.timestamps = np.zeros(window, dtype=np.float64)
+        self.filled = np.zeros(window, dtype=bool)
+        self.index = 0
+
+    def reset(self):
+        self.filled[:] = False
+        self.index = 0
+
+    def add(self, counts, timestamp=None):
+        """counts: vektor jumlah per class id untuk satu frame"""
+        self.counts[self.index] = counts
+        self.timestamps[self.index] = time.time() if timestamp is None else timestamp
+        self.filled[self.index] = True
+        self.index = (self.index + 1) % self.window
+
+    def active(self, now=None):
+        now = time.time() if now is None else now
+        mask = self.filled & (now - self.timestamps <= self.max_age)
+        return self.counts[mask]
+
+    def mode(self, rows):
+        """Modus per class (kalau seri, jumlah yang lebih kecil yang dipakai)"""
+        if len(rows) == 0:
+            return np.zeros(self.n_classes, dtype=np.int32)
+        values = np.arange(rows.max() + 1)
+        histogram = (rows[:, :, None] == values).sum(axis=0)
+        return histogram.argmax(axis=1).astype(np.int32)
+
+    def summary(self, now=None):
+        """
+        Returns: (counts, stability, n_frames)
+        counts = modus per class id, stability = 0..1
+        """
+        rows = self.active(now)
+        counts = self.mode(rows)
+        if len(rows) == 0:
+            return counts, 0.0, 0
+        stability = float(np.all(rows == counts, axis=1).mean())
+        return counts, stability, len(rows)
@@ -0,0 +1,169 @@
+import multiprocessing as mp
+import os
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+
+def attach_shared_memory(name):
+    shm = shared_memory.SharedMemory(name=name)
+    # Block milik proses lain; jangan sampai resource tracker ikut meng-unlink-nya
+    if os.name == "posix":
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+class SharedFrameRing:
+    """
+    Ring buffer frame di satu block multiprocessing.shared_memory.
+
+    Block dibagi jadi `slots` slot berukuran `slot_size` byte; frame ke-n
+    ditulis di slot n % slots. Yang lewat pipe hanya (slot, shape), pixel
+    frame tidak pernah di-pickle.
+    """
+    def __init__(self, slot_size, slots=4, name=None):
+        self.slot_size = slot_size
+        self.slots = slots
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=slot_size * slots)
+            self.owner = True
+        else:
+            # Worker spawn memakai resource tracker yang sama dengan parent,
+            # jadi block cukup di-attach biasa (parent yang meng-unlink)
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.next_slot = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def write(self, frame):
+        """Returns: index slot tempat frame ditulis"""
+        slot = self.next_slot
+        self.next_slot = (self.next_slot + 1) % self.slots
+        start = slot * self.slot_size
+        view = np.ndarray(frame.shape, dtype=np.uint8, buffer=self.shm.buf, offset=start)
+        np.copyto(view, frame)
+        return slot
+
+    def view(self, slot, shape):
+        return np.ndarray(shape, dtype=np.uint8, buffer=self.shm.buf, offset=slot * self.slot_size)
+
+    def close(self):
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _worker_main(conn, weights, backend, imgsz, ring_name, slot_size, slots):
+    """Loop di proses worker: baca frame dari ring, kirim balik array deteksi saja"""
+    from inference_engine import load_engine
+
+    try:
+        engine = load_engine(weights, backend, imgsz)
+    except Exception as e:
+        conn.send({"error": str(e)})
+        conn.close()
+        return
+    conn.send({"names": engine.names, "backend": engine.backend})
+    ring = SharedFrameRing(slot_size, slots, name=ring_name)
+
+    while True:
+        try:
+            msg = conn.recv()
+        except EOFError:
+            break
+        if msg["op"] == "stop":
+            break
+        if msg["op"] == "attach":
+            ring.close()
+            ring = SharedFrameRing(msg["slot_size"], msg["slots"], name=msg["shm"])
+            continue
+
+        start = time.perf_counter()
+        frames = [ring.view(slot, shape) for slot, shape in zip(msg["slots"], msg["shapes"])]
+        try:
+            outputs = engine.predict(frames, conf=msg["conf"], imgsz=msg["imgsz"])
+        except Exception as e:
+            print(f"Inference error: {e}")
+            outputs = [(np.zeros((0, 4), np.float32), np.zeros(0, np.float32), np.zeros(0, np.int64))] * len(frames)
+        conn.send({"outputs": outputs, "infer_time": time.perf_counter() - start})
+
+    ring.close()
+    conn.close()
+
+
+class InferenceProcess:
+    """
+    Model YOLO di proses terpisah supaya tidak berebut GIL dengan Tk.
+
+    Kontraknya sama dengan InferenceEngine: predict(frames, conf, imgsz) ->
+    [(xyxy, conf, cls), ...] dan atribut names. Frame ditulis ke
+    SharedFrameRing lalu thread pemanggil menunggu di pipe (GIL dilepas)
+    sampai worker mengirim balik array deteksi.
+    """
+    def __init__(self, weights, backend="torch", imgsz=640, slots=4, slot_size=1920 * 1080 * 3):
+        self.imgsz = imgsz
+        self.slots = slots
+        self.ring = SharedFrameRing(slot_size, slots)
+        self.conn, child_conn = mp.Pipe()
+        # spawn: aman untuk torch dan sama perilakunya di Windows maupun Linux
+        self.process = mp.get_context("spawn").Process(
+            target=_worker_main,
+            args=(child_conn, weights, backend, imgsz, self.ring.name, slot_size, slots),
+            daemon=True,
+        )
+        self.process.start()
+
+        info = self._recv()
+        if "error" in info:
+            self.process.join(timeout=2.0)
+            self.ring.close()
+            raise RuntimeError(info["error"])
+        self.names = info["names"]
+        self.backend = f"process:{info['backend']}"
+        self.last_infer_time = 0.0
+        self.last_roundtrip = 0.0
+
+    def _recv(self):
+        # Jangan menunggu selamanya kalau worker mati (mis. gagal load model)
+        while not self.conn.poll(0.5):
+            if not self.process.is_alive():
+                raise RuntimeError(f"Inference process exited with code {self.process.exitcode}")
+        return self.conn.recv()
+
+    def _ensure_capacity(self, nbytes):
+        if nbytes <= self.ring.slot_size:
+            return
+        self.ring.close()
+        self.ring = SharedFrameRing(nbytes, self.slots)
+        self.conn.send({"op": "attach", "shm": self.ring.name, "slot_size": nbytes, "slots": self.slots})
+
+    def predict(self, frames, conf=0.25, imgsz=None):
+        if isinstance(frames, np.ndarray):
+            frames = [frames]
+        frames = [np.ascontiguousarray(f, dtype=np.uint8) for f in frames]
+        if len(frames) > self.slots:
+            raise ValueError(f"At most {self.slots} frames per call")
+        self._ensure_capacity(max(f.nbytes for f in frames))
+
+        start = time.perf_counter()
+        slots = [self.ring.write(f) for f in frames]
+        self.conn.send({"op": "predict", "slots": slots, "shapes": [f.shape for f in frames],
+                        "conf": conf, "imgsz": imgsz or self.imgsz})
+        reply = self._recv()
+        self.last_infer_time = reply["infer_time"]
+        self.last_roundtrip = time.perf_counter() - start
+        return reply["outputs"]
+
+    def close(self):
+        if self.process.is_alive():
+            try:
+                self.conn.send({"op": "stop"})
+            except (OSError, BrokenPipeError):
+                pass
+            self.process.join(timeout=2.0)
+        self.conn.close()
+        self.ring.close()
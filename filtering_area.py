@@ -1,35 +1,118 @@
-from area_rules import AREA_RULES, parse_area_rules
+import numpy as np
+
+from area_rules import AREA_RULES, parse_area_rules, compile_area_rules
+
+def boxes_to_arrays(boxes):
+    """
+    Ambil xyxy, conf, cls dari Boxes ultralytics sekali jalan (tanpa loop per box)
+    Returns: (xyxy float Nx4, conf float N, cls int N)
+    """
+    if isinstance(boxes, tuple):
+        return boxes
+    return (
+        boxes.xyxy.cpu().numpy(),
+        boxes.conf.cpu().numpy(),
+        boxes.cls.cpu().numpy().astype(np.int64),
+    )
+
+def best_per_class(cls, conf):
+    """
+    Index box dengan confidence tertinggi untuk setiap class (satu pass numpy).
+    Kalau conf sama, box yang muncul terakhir yang dipakai.
+    """
+    if len(cls) == 0:
+        return np.zeros(0, dtype=np.int64)
+    order = np.lexsort((conf, cls))
+    cls_sorted = cls[order]
+    is_last = np.append(cls_sorted[1:] != cls_sorted[:-1], True)
+    return order[is_last]
 
 def filter_detections(area_name, detections, model):
-    rules = parse_area_rules(area_name)
+    """
+    Returns: (keep, validation)
+    keep = index box yang lolos filter area (komponen OK lalu defect),
+    validation = hasil validate_component_counts (None kalau area tidak punya rules)
+    """
+    xyxy, conf, cls = boxes_to_arrays(detections)
+    compiled = compile_area_rules(model.names)
 
-    if not rules:
-        return detections
-
-    allowed_components = set(rules.keys())
-    ok_detections = []
-    defect_detections = []
-    component_counts = {}
-
-    for box in detections:
-        cls_id = int(box.cls[0])
-        cls_name=model.names[cls_id]
-
-        if cls_name.startswith("No "):
-            base_component = cls_name.replace("No ","")
-            defect_detections.append({
-                "box": box,
-                "type": "missing",
-                "component": base_component,
-                "class_name": cls_name
+    if not compiled.has_area(area_name):
+        return np.arange(len(cls)), None
+
+    counts, is_ok = compiled.count_vector(area_name, cls)
+    is_missing = compiled.defect_mask[cls]
+
+    validation_results = validate_count_vector(compiled, area_name, counts, cls[is_missing])
+    keep = np.concatenate([np.flatnonzero(is_ok), np.flatnonzero(is_missing)])
+    return keep, validation_results
+
+def validate_counts(area_name, counts, model):
+    """
+    Validasi dari vektor jumlah per class id (mis. hasil agregasi beberapa frame)
+    Returns: validation, None kalau area tidak punya rules
+    """
+    compiled = compile_area_rules(model.names)
+    if not compiled.has_area(area_name):
+        return None
+
+    counts = np.asarray(counts, dtype=np.int64)
+    ok_counts = np.where(compiled.ruled[compiled.area_index[area_name]], counts, 0)
+    defect_cls = np.repeat(np.arange(len(counts)), np.where(compiled.defect_mask, counts, 0))
+    return validate_count_vector(compiled, area_name, ok_counts, defect_cls)
+
+def validate_count_vector(compiled, area_name, counts, defect_cls):
+    """
+    Validasi pakai rules yang sudah dikompilasi: selisih = counts - expected
+    (satu pengurangan vektor). Hasilnya sama formatnya dengan validate_component_counts.
+    """
+    diff = compiled.difference(area_name, counts)
+
+    validation = {
+        "status": "ok",
+        "area": area_name,
+        "expected": {},
+        "actual": {},
+        "missing": [],
+        "excess": [],
+        "defects": [],
+        "message": ""
+    }
+
+    for component, cls_id, expected_count in compiled.components[area_name]:
+        actual_count = int(counts[cls_id]) if cls_id >= 0 else 0
+        delta = int(diff[cls_id]) if cls_id >= 0 else -expected_count
+        validation["expected"][component] = expected_count
+        validation["actual"][component] = actual_count
+
+        if delta < 0:
+            validation["missing"].append({
+                "component": component,
+                "expected": expected_count,
+                "actual": actual_count,
+                "shortage": -delta
+            })
+        elif delta > 0:
+            validation["excess"].append({
+                "component": component,
+                "expected": expected_count,
+                "actual": actual_count,
+                "excess": delta
             })
-        elif cls_name in allowed_components:
-            ok_detections.append(box)
-            component_counts[cls_name] = component_counts.get(cls_name, 0) + 1
 
-    validation_results = validate_component_counts(area_name, component_counts, defect_detections, rules)
-    all_detections = ok_detections + [d["box"] for d in defect_detections]
-    return all_detections, validation_results
+    for cls_id in defect_cls:
+        validation["defects"].append({
+            "type": "missing",
+            "component": compiled.defect_base[cls_id],
+            "class_name": compiled.class_names[cls_id]
+        })
+
+    if validation["missing"] or validation["defects"]:
+        validation["status"] = "error"
+    elif validation["excess"]:
+        validation["status"] = "warning"
+
+    validation["message"] = validation_message(validation)
+    return validation
 
 def validate_component_counts(area_name, component_counts, defect_detections, rules):
     validation = {
@@ -79,21 +162,23 @@ def validate_component_counts(area_name, component_counts, defect_detections, ru
         })
         validation["status"] = "error"
     
-    # Generate message
-    if validation["status"] == "ok":
-        validation["message"] = f"✅ {area_name}: All components OK"
-    else:
-        messages = []
-        if validation["missing"]:
-            messages.append(f"Missing: {len(validation['missing'])} type(s)")
-        if validation["excess"]:
-            messages.append(f"Excess: {len(validation['excess'])} type(s)")
-        if validation["defects"]:
-            messages.append(f"Defects: {len(validation['defects'])} issue(s)")
-        validation["message"] = f"❌ {area_name}: {', '.join(messages)}"
-    
+    validation["message"] = validation_message(validation)
     return validation
 
+def validation_message(validation):
+    area_name = validation["area"]
+    if validation["status"] == "ok":
+        return f"✅ {area_name}: All components OK"
+
+    messages = []
+    if validation["missing"]:
+        messages.append(f"Missing: {len(validation['missing'])} type(s)")
+    if validation["excess"]:
+        messages.append(f"Excess: {len(validation['excess'])} type(s)")
+    if validation["defects"]:
+        messages.append(f"Defects: {len(validation['defects'])} issue(s)")
+    return f"❌ {area_name}: {', '.join(messages)}"
+
 
 def get_area_component_list(area_name):
     rules = parse_area_rules(area_name)
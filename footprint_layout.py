@@ -0,0 +1,188 @@
+import json
+import math
+import os
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from class_taxonomy import canonical_key
+
+FOOTPRINTS_FILE = "footprints.json"
+
+
+def load_footprints(path=FOOTPRINTS_FILE):
+    """
+    Baca posisi footprint per area (koordinat golden image) dari JSON:
+    {"Area 1": [{"designator": "R25", "component": "Resistor", "x": 412, "y": 118}, ...]}
+    "marking" boleh diisi per footprint; kalau tidak, diambil dari resistor_database.
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+class GridIndex:
+    """Spatial hash sederhana: titik dikelompokkan per sel ukuran `cell` pixel"""
+    def __init__(self, points, cell):
+        self.cell = cell
+        self.cells = {}
+        for i, (x, y) in enumerate(points):
+            self.cells.setdefault((int(x // cell), int(y // cell)), []).append(i)
+
+    def near(self, x, y):
+        """Index titik di sel (x, y) dan 8 sel tetangganya"""
+        gx, gy = int(x // self.cell), int(y // self.cell)
+        found = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                found.extend(self.cells.get((gx + dx, gy + dy), ()))
+        return found
+
+
+def greedy_assign(pairs):
+    """Assignment greedy dari list sparse (det, fp, jarak), jarak terkecil dulu"""
+    used_dets, used_fps, matches = set(), set(), {}
+    for d, f, dist in sorted(pairs, key=lambda p: p[2]):
+        if d not in used_dets and f not in used_fps:
+            used_dets.add(d)
+            used_fps.add(f)
+            matches[f] = (d, dist)
+    return matches
+
+
+class FootprintMatcher:
+    """
+    Cocokkan deteksi (sudah di koordinat golden) ke designator footprint.
+
+    Kandidat pasangan dicari lewat GridIndex dalam `search_radius`, jadi tidak
+    ada matrix jarak penuh N x M. Pasangan kandidat dipecah per komponen
+    terhubung; kelompok sampai `max_group` diselesaikan dengan Hungarian
+    (linear_sum_assignment), kelompok yang lebih besar (footprint sangat rapat)
+    pakai greedy pada pasangan sparse supaya tidak kubik. Hasil per designator:
+    present     : komponen benar, posisi dalam `tolerance`, marking cocok
+    misplaced   : komponen benar tapi bergeser lebih dari `tolerance`
+    wrong_value : posisi benar tapi marking OCR tidak sama dengan yang diharapkan
+    missing     : tidak ada deteksi, atau yang terdeteksi class "No ..."
+    """
+    def __init__(self, footprints, designator_markings=None, tolerance=12.0, search_radius=48.0,
+                 max_group=64):
+        self.tolerance = tolerance
+        self.search_radius = search_radius
+        self.max_group = max_group
+        self.footprints = []
+        for fp in footprints:
+            designator = fp["designator"].strip()
+            marking = fp.get("marking") or (designator_markings or {}).get(designator)
+            self.footprints.append({
+                "designator": designator,
+                "component": fp["component"],
+                "key": canonical_key(fp["component"]),
+                "position": (float(fp["x"]), float(fp["y"])),
+                "marking": marking,
+            })
+        self.positions = [fp["position"] for fp in self.footprints]
+        self.index = GridIndex(self.positions, search_radius)
+
+    def candidate_pairs(self, points, keys):
+        """Returns: list (det, fp, jarak) yang jenis komponennya sama dan dalam search_radius"""
+        pairs = []
+        for d, (x, y) in enumerate(points):
+            for f in self.index.near(x, y):
+                if self.footprints[f]["key"] != keys[d]:
+                    continue
+                fx, fy = self.positions[f]
+                dist = math.hypot(x - fx, y - fy)
+                if dist <= self.search_radius:
+                    pairs.append((d, f, dist))
+        return pairs
+
+    def assign(self, pairs):
+        """Hungarian per kelompok pasangan yang saling terhubung. Returns: {fp: (det, jarak)}"""
+        parent = {}
+
+        def find(node):
+            while parent.setdefault(node, node) != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+
+        for d, f, _ in pairs:
+            parent[find(("d", d))] = find(("f", f))
+
+        groups = {}
+        for pair in pairs:
+            groups.setdefault(find(("d", pair[0])), []).append(pair)
+
+        assigned = {}
+        for group in groups.values():
+            dets = sorted(set(p[0] for p in group))
+            fps = sorted(set(p[1] for p in group))
+            if max(len(dets), len(fps)) > self.max_group:
+                assigned.update(greedy_assign(group))
+                continue
+            # Pasangan yang bukan kandidat diberi biaya di atas radius supaya tidak dipilih
+            cost = np.full((len(dets), len(fps)), self.search_radius * 10, dtype=np.float32)
+            row = {d: i for i, d in enumerate(dets)}
+            col = {f: j for j, f in enumerate(fps)}
+            for d, f, dist in group:
+                cost[row[d], col[f]] = dist
+            rows, cols = linear_sum_assignment(cost)
+            for r, c in zip(rows.tolist(), cols.tolist()):
+                if cost[r, c] <= self.search_radius:
+                    assigned[fps[c]] = (dets[r], float(cost[r, c]))
+        return assigned
+
+    def validate(self, area_name, points, components, is_missing, markings=None):
+        """
+        points     : titik tengah deteksi (N x 2) di koordinat golden
+        components : nama komponen dasar per deteksi (taxonomy.base_component)
+        is_missing : bool per deteksi (class "No ...")
+        markings   : {index deteksi: marking hasil OCR}
+        Returns: dict validasi posisi per designator
+        """
+        markings = markings or {}
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2).tolist()
+        keys = [canonical_key(c) for c in components]
+        assigned = self.assign(self.candidate_pairs(points, keys))
+
+        results = []
+        for f, fp in enumerate(self.footprints):
+            result = {"designator": fp["designator"], "component": fp["component"],
+                      "expected_marking": fp["marking"], "detection": None,
+                      "distance": None, "marking": None}
+            if f not in assigned:
+                result["status"] = "missing"
+            else:
+                det, dist = assigned[f]
+                marking = markings.get(det)
+                result.update(detection=det, distance=dist, marking=marking)
+                if is_missing[det]:
+                    result["status"] = "missing"
+                elif dist > self.tolerance:
+                    result["status"] = "misplaced"
+                elif fp["marking"] and marking and marking != fp["marking"]:
+                    result["status"] = "wrong_value"
+                else:
+                    result["status"] = "present"
+            results.append(result)
+
+        used = set(det for det, _ in assigned.values())
+        extra = [d for d in range(len(points)) if d not in used and not is_missing[d]]
+        counts = {}
+        for result in results:
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+
+        status = "ok" if counts.get("present", 0) == len(results) else "error"
+        message = f"{area_name}: {counts.get('present', 0)}/{len(results)} footprints OK"
+        problems = [f"{k}: {v}" for k, v in counts.items() if k != "present"]
+        if problems:
+            message += " (" + ", ".join(problems) + ")"
+        return {
+            "status": status,
+            "area": area_name,
+            "designators": results,
+            "extra": extra,
+            "counts": counts,
+            "message": message,
+        }
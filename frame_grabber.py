@@ -0,0 +1,135 @@
+import threading
+import time
+
+from frame_pool import FramePool
+
+
+class FrameGrabber:
+    """
+    Baca frame kamera di thread sendiri dan simpan HANYA frame terbaru (single slot).
+    Loop deteksi selalu mengambil frame paling baru, frame lama yang belum
+    sempat diproses langsung ditimpa (dihitung sebagai drop).
+
+    Frame dibaca langsung ke buffer FramePool (cap.read(image=buf)), jadi
+    tidak ada alokasi baru per frame. Frame dari read() dipegang pemanggil
+    sampai read() berikutnya; setelah itu buffernya bisa ditimpa kamera.
+    """
+    def __init__(self, cap, pool=None):
+        self.cap = cap
+        self.pool = pool or FramePool("capture")
+        self.cond = threading.Condition()
+        self.thread = None
+        self.is_running = False
+        self.failed = False
+
+        # Slot frame terbaru (FrameBuffer) dan frame yang sedang dipakai consumer
+        self.frame = None
+        self.held = None
+        self.frame_shape = None
+        # False kalau backend kamera mengabaikan image= dan selalu alokasi array baru
+        self.read_into = True
+        self.seq = 0
+        self.timestamp = 0.0
+
+        # Counter
+        self.frames_captured = 0
+        self.frames_consumed = 0
+        self.frames_dropped = 0
+        self.consumed_seq = 0
+
+    def start(self):
+        if self.is_running:
+            return
+        self.is_running = True
+        self.failed = False
+        self.thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=1.0):
+        with self.cond:
+            self.is_running = False
+            self.cond.notify_all()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+        self.thread = None
+
+    def _capture_loop(self):
+        while self.is_running:
+            buf = self.pool.acquire(self.frame_shape) if self.read_into and self.frame_shape else None
+            if buf is None:
+                ret, frame = self.cap.read()
+            else:
+                ret, frame = self.cap.read(image=buf.array)
+            timestamp = time.time()
+
+            if ret and frame is not None and (buf is None or frame.ctypes.data != buf.array.ctypes.data):
+                # Frame pertama atau resolusi berubah -> OpenCV mengalokasikan array baru
+                if buf is not None:
+                    buf.release()
+                    if buf.array.shape == frame.shape:
+                        # Shape sama tapi tetap array baru: image= diabaikan backend,
+                        # baca biasa dan array-nya tidak disimpan di pool
+                        self.read_into = False
+                buf = self.pool.wrap(frame, reuse=self.read_into)
+                self.frame_shape = frame.shape
+
+            with self.cond:
+                if not ret or frame is None:
+                    if buf is not None:
+                        buf.release()
+                    self.failed = True
+                    self.is_running = False
+                    self.cond.notify_all()
+                    break
+
+                # Frame sebelumnya belum diambil -> ditimpa
+                if self.frame is not None and self.seq != self.consumed_seq:
+                    self.frames_dropped += 1
+
+                if self.frame is not None:
+                    self.frame.release()
+                self.frame = buf
+                self.seq += 1
+                self.timestamp = timestamp
+                self.frames_captured += 1
+                self.cond.notify_all()
+
+    def read(self, last_seq=0, timeout=1.0):
+        """
+        Ambil frame terbaru yang seq-nya lebih baru dari last_seq.
+        Frame sebelumnya dari read() dilepas ke pool.
+        Returns: (ret, frame, seq, timestamp)
+        """
+        with self.cond:
+            self.cond.wait_for(
+                lambda: self.seq > last_seq or self.failed or not self.is_running,
+                timeout
+            )
+            if self.seq <= last_seq or self.frame is None:
+                return False, None, last_seq, 0.0
+
+            if self.held is not None:
+                self.held.release()
+            self.held = self.frame.retain()
+            self.consumed_seq = self.seq
+            self.frames_consumed += 1
+            return True, self.frame.array, self.seq, self.timestamp
+
+    def latest(self):
+        """
+        Frame terbaru tanpa menunggu dan tanpa menandai sebagai consumed.
+        Isinya bisa ditimpa kamera, pakai untuk shape atau salin dulu.
+        """
+        with self.cond:
+            return self.frame.array if self.frame is not None else None
+
+    def get_stats(self):
+        with self.cond:
+            return {
+                "captured": self.frames_captured,
+                "consumed": self.frames_consumed,
+                "dropped": self.frames_dropped,
+                "seq": self.seq,
+                "age": time.time() - self.timestamp if self.timestamp else 0.0,
+                "pool": self.pool.get_stats(),
+            }
@@ -0,0 +1,124 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+class FrameBuffer:
+    """Array frame milik FramePool dengan reference count"""
+    __slots__ = ("array", "refs", "pool", "reuse")
+
+    def __init__(self, array, pool, reuse=True):
+        self.array = array
+        self.refs = 1
+        self.pool = pool
+        self.reuse = reuse
+
+    def retain(self):
+        self.pool.retain(self)
+        return self
+
+    def release(self):
+        self.pool.release(self)
+
+
+class FramePool:
+    """
+    Pool buffer frame uint8 yang dipakai ulang, bukan dialokasikan tiap frame.
+
+    acquire() memberi buffer bebas (refs = 1) atau membuat baru kalau semua
+    sedang dipegang. Setiap tahap yang menyimpan buffer melewati satu frame
+    memanggil retain(), dan release() kalau sudah selesai; buffer kembali
+    ke antrean bebas (FIFO) ketika refs 0, maksimal `max_free` buffer;
+    sisanya dilepas ke garbage collector. Buffer dengan shape lain dibuang
+    saat ditemui (mis. ukuran label GUI berubah).
+    """
+    def __init__(self, name="frames", max_free=4, rate_window=1.0):
+        self.name = name
+        self.max_free = max_free
+        self.rate_window = rate_window
+        self.lock = threading.Lock()
+        self.free = deque()
+
+        self.allocations = 0
+        self.bytes_allocated = 0
+        self.reuses = 0
+        self.bytes_reused = 0
+        self.discarded = 0
+
+        # Laju alokasi dihitung per window, bukan sejak start
+        self.window_start = time.time()
+        self.window_allocated = 0
+        self.window_reused = 0
+        self.alloc_rate = 0.0
+        self.reuse_rate = 0.0
+
+    def acquire(self, shape):
+        shape = tuple(shape)
+        with self.lock:
+            while self.free:
+                buf = self.free.popleft()
+                if buf.array.shape == shape:
+                    buf.refs = 1
+                    self.reuses += 1
+                    self.bytes_reused += buf.array.nbytes
+                    self.window_reused += buf.array.nbytes
+                    return buf
+            array = np.empty(shape, dtype=np.uint8)
+            self._count_allocation(array)
+        return FrameBuffer(array, self)
+
+    def wrap(self, array, reuse=True):
+        """
+        Masukkan array yang sudah dialokasikan pihak lain (mis. cap.read) ke pool.
+        reuse=False: hanya refcount, setelah di-release array tidak disimpan.
+        """
+        with self.lock:
+            self._count_allocation(array)
+        return FrameBuffer(array, self, reuse)
+
+    def copy_from(self, src):
+        """Pengganti src.copy(): salin ke buffer pool"""
+        buf = self.acquire(src.shape)
+        np.copyto(buf.array, src)
+        return buf
+
+    def _count_allocation(self, array):
+        self.allocations += 1
+        self.bytes_allocated += array.nbytes
+        self.window_allocated += array.nbytes
+
+    def retain(self, buf):
+        with self.lock:
+            buf.refs += 1
+
+    def release(self, buf):
+        with self.lock:
+            buf.refs -= 1
+            if buf.refs == 0:
+                if buf.reuse and len(self.free) < self.max_free:
+                    self.free.append(buf)
+                else:
+                    self.discarded += 1
+
+    def get_stats(self):
+        with self.lock:
+            now = time.time()
+            elapsed = now - self.window_start
+            if elapsed >= self.rate_window:
+                self.alloc_rate = self.window_allocated / elapsed
+                self.reuse_rate = self.window_reused / elapsed
+                self.window_start = now
+                self.window_allocated = 0
+                self.window_reused = 0
+            return {
+                "allocations": self.allocations,
+                "allocated_mb": self.bytes_allocated / 1e6,
+                "reuses": self.reuses,
+                "reused_mb": self.bytes_reused / 1e6,
+                "discarded": self.discarded,
+                "alloc_mb_s": self.alloc_rate / 1e6,
+                "reuse_mb_s": self.reuse_rate / 1e6,
+                "free": len(self.free),
+            }
@@ -0,0 +1,97 @@
+import hashlib
+import os
+import shutil
+
+import numpy as np
+from ultralytics import YOLO
+
+from filtering_area import boxes_to_arrays
+
+BACKENDS = ("torch", "onnx", "openvino", "onnx_int8", "openvino_int8")
+# Backend bisa diganti tanpa ubah kode: PCB_QC_BACKEND=onnx python conf_detection_with_ocr.py
+DEFAULT_BACKEND = os.environ.get("PCB_QC_BACKEND", "torch")
+ENGINE_CACHE_DIR = "engine_cache"
+
+
+def weights_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def engine_cache_path(weights, backend, imgsz=640, cache_dir=ENGINE_CACHE_DIR):
+    """Path model backend di cache, dikunci dengan hash weights dan imgsz"""
+    name = os.path.splitext(os.path.basename(weights))[0]
+    target_dir = os.path.join(cache_dir, f"{name}_{weights_hash(weights)}_{imgsz}")
+    suffix = "_int8" if backend.endswith("_int8") else ""
+    if backend.startswith("onnx"):
+        return os.path.join(target_dir, f"{name}{suffix}.onnx")
+    return os.path.join(target_dir, f"{name}{suffix}_openvino_model")
+
+
+def export_model(weights, backend, imgsz=640, cache_dir=ENGINE_CACHE_DIR):
+    """
+    Export weights .pt ke format backend, sekali per (hash weights, imgsz).
+    Model INT8 tidak di-export otomatis: harus lolos scripts/quantize_model.py dulu.
+    Returns: path model hasil export di cache_dir
+    """
+    target = engine_cache_path(weights, backend, imgsz, cache_dir)
+    if os.path.exists(target):
+        return target
+    if backend.endswith("_int8"):
+        raise FileNotFoundError(f"{target} not found, run scripts/quantize_model.py first")
+
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    # dynamic=True supaya imgsz lain (mis. inferensi ROI) tetap bisa dipakai
+    exported = YOLO(weights).export(format=backend, imgsz=imgsz, dynamic=True)
+    shutil.move(str(exported), target)
+    return target
+
+
+class InferenceEngine:
+    """
+    Satu kontrak inferensi untuk semua backend:
+    predict(frames, conf, imgsz) -> [(xyxy, conf, cls), ...] satu tuple per frame.
+
+    "torch" memakai weights .pt langsung; "onnx" (ONNX Runtime), "openvino", dan
+    varian "_int8" memakai model di engine_cache yang di-load lewat YOLO, jadi
+    preprocessing (letterbox) dan NMS sama persis dengan versi PyTorch.
+    Memanggil engine seperti YOLO (engine(frame, ...)) tetap mengembalikan
+    Results ultralytics untuk kode lama.
+    """
+    def __init__(self, weights, backend=DEFAULT_BACKEND, imgsz=640, cache_dir=ENGINE_CACHE_DIR):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend {backend}, expected one of {BACKENDS}")
+        self.weights = weights
+        self.backend = backend
+        self.imgsz = imgsz
+
+        path = weights if backend == "torch" else export_model(weights, backend, imgsz, cache_dir)
+        self.model = YOLO(path, task="detect")
+        self.names = self.model.names
+
+    def predict(self, frames, conf=0.25, imgsz=None):
+        if isinstance(frames, np.ndarray):
+            frames = [frames]
+        results = self.model(frames, conf=conf, imgsz=imgsz or self.imgsz, verbose=False)
+        return [boxes_to_arrays(result.boxes) for result in results]
+
+    def __call__(self, *args, **kwargs):
+        return self.model(*args, **kwargs)
+
+
+def load_engine(weights, backend=DEFAULT_BACKEND, imgsz=640):
+    """
+    InferenceEngine untuk backend yang diminta. Tidak diam-diam kembali ke
+    PyTorch: PC line yang diset ke engine cepat harus gagal jelas, bukan
+    jalan lambat tanpa terlihat.
+    """
+    try:
+        return InferenceEngine(weights, backend, imgsz)
+    except Exception as e:
+        if backend == "torch":
+            raise
+        raise RuntimeError(f"Inference backend {backend} not available ({e}); "
+                           f"fix the export/runtime or set PCB_QC_BACKEND=torch") from e
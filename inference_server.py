@@ -0,0 +1,263 @@
+import os
+import queue
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+from multiprocessing.connection import Client, Listener
+
+import numpy as np
+
+from detection_process import InferenceProcess, attach_shared_memory
+from inference_engine import DEFAULT_BACKEND, load_engine
+
+# Alamat server, mis. PCB_QC_SERVER=localhost:6001 -> GUI jadi thin client
+SERVER_ENV = "PCB_QC_SERVER"
+DEFAULT_ADDRESS = ("localhost", 6001)
+AUTHKEY = b"pcb-qc"
+
+
+def parse_address(text):
+    host, _, port = text.rpartition(":")
+    return (host or "localhost", int(port))
+
+
+class InferenceServer:
+    """
+    Satu model untuk banyak GUI/kamera di PC yang sama.
+
+    Client terhubung lewat multiprocessing.connection (localhost) dan menaruh
+    frame di shared memory miliknya sendiri; yang dikirim lewat socket hanya
+    nama block + shape. Request dari semua client dikumpulkan sampai
+    `max_batch` frame atau `max_wait` detik sejak request pertama, lalu
+    diinferensi sekali per imgsz. Statistik latency dan ukuran batch dicatat
+    per client.
+    """
+    def __init__(self, engine, address=DEFAULT_ADDRESS, authkey=AUTHKEY, max_batch=4, max_wait=0.005):
+        self.engine = engine
+        self.address = address
+        self.authkey = authkey
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+
+        self.requests = queue.Queue()
+        self.running = False
+        self.stats_lock = threading.Lock()
+        self.client_stats = {}
+        self.batches = 0
+        self.batched_frames = 0
+
+    def serve_forever(self):
+        self.running = True
+        threading.Thread(target=self._batch_loop, daemon=True).start()
+        with Listener(self.address, authkey=self.authkey) as listener:
+            print(f"Inference server ({self.engine.backend}) listening on {self.address[0]}:{self.address[1]}")
+            while self.running:
+                conn = listener.accept()
+                threading.Thread(target=self._client_loop, args=(conn,), daemon=True).start()
+
+    def stop(self):
+        self.running = False
+
+    def _client_loop(self, conn):
+        client_id = None
+        shm = None
+        try:
+            while True:
+                msg = conn.recv()
+                op = msg["op"]
+                if op == "hello":
+                    client_id = msg["client"]
+                    with self.stats_lock:
+                        self.client_stats.setdefault(client_id, {
+                            "requests": 0, "frames": 0, "latency_sum": 0.0,
+                            "last_latency": 0.0, "batch_sum": 0, "max_batch": 0,
+                        })
+                    conn.send({"names": self.engine.names, "backend": self.engine.backend})
+                elif op == "predict":
+                    if shm is None or shm.name != msg["shm"]:
+                        if shm is not None:
+                            shm.close()
+                        shm = attach_shared_memory(msg["shm"])
+                    conn.send(self._predict_frames(client_id, shm, msg))
+                elif op == "stats":
+                    conn.send(self.get_stats())
+                elif op == "close":
+                    break
+        except (EOFError, ConnectionResetError, BrokenPipeError):
+            pass
+        finally:
+            if shm is not None:
+                shm.close()
+            conn.close()
+
+    def _predict_frames(self, client_id, shm, msg):
+        """Masukkan frame client ke antrean batch dan tunggu hasilnya"""
+        start = time.perf_counter()
+        pending = []
+        offset = 0
+        for shape in msg["shapes"]:
+            size = int(np.prod(shape))
+            frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=offset)
+            offset += size
+            request = {"frame": frame, "conf": msg["conf"], "imgsz": msg["imgsz"],
+                       "done": threading.Event(), "result": None, "batch": 0}
+            self.requests.put(request)
+            pending.append(request)
+
+        for request in pending:
+            request["done"].wait()
+        latency = time.perf_counter() - start
+
+        with self.stats_lock:
+            stats = self.client_stats[client_id]
+            stats["requests"] += 1
+            stats["frames"] += len(pending)
+            stats["latency_sum"] += latency
+            stats["last_latency"] = latency
+            batch = max(r["batch"] for r in pending) if pending else 0
+            stats["batch_sum"] += batch
+            stats["max_batch"] = max(stats["max_batch"], batch)
+        return [r["result"] for r in pending]
+
+    def _batch_loop(self):
+        while self.running:
+            try:
+                first = self.requests.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            batch = [first]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.requests.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._run_batch(batch)
+
+    def _run_batch(self, batch):
+        # Satu inferensi per imgsz; conf pakai yang paling rendah lalu disaring per request
+        groups = {}
+        for request in batch:
+            groups.setdefault(request["imgsz"], []).append(request)
+
+        for imgsz, requests in groups.items():
+            min_conf = min(r["conf"] for r in requests)
+            try:
+                outputs = self.engine.predict([r["frame"] for r in requests], conf=min_conf, imgsz=imgsz)
+            except Exception as e:
+                print(f"Inference error: {e}")
+                outputs = [(np.zeros((0, 4), np.float32), np.zeros(0, np.float32), np.zeros(0, np.int64))] * len(requests)
+
+            for request, (xyxy, conf, cls) in zip(requests, outputs):
+                keep = conf >= request["conf"]
+                request["result"] = (xyxy[keep], conf[keep], cls[keep])
+                request["batch"] = len(batch)
+                request["done"].set()
+
+        self.batches += 1
+        self.batched_frames += len(batch)
+
+    def get_stats(self):
+        with self.stats_lock:
+            clients = {}
+            for client_id, s in self.client_stats.items():
+                n = s["requests"]
+                clients[client_id] = {
+                    "requests": n,
+                    "frames": s["frames"],
+                    "mean_latency": s["latency_sum"] / n if n else 0.0,
+                    "last_latency": s["last_latency"],
+                    "mean_batch": s["batch_sum"] / n if n else 0.0,
+                    "max_batch": s["max_batch"],
+                }
+        return {
+            "batches": self.batches,
+            "mean_batch": self.batched_frames / self.batches if self.batches else 0.0,
+            "clients": clients,
+        }
+
+
+class InferenceClient:
+    """
+    Thin client dengan kontrak yang sama dengan InferenceEngine:
+    predict(frames, conf, imgsz) -> [(xyxy, conf, cls), ...] dan atribut names.
+    Frame ditulis ke shared memory milik client (diperbesar kalau kurang).
+    """
+    def __init__(self, address=DEFAULT_ADDRESS, authkey=AUTHKEY, client_name=None, imgsz=640):
+        self.imgsz = imgsz
+        self.client_id = client_name or f"{os.path.basename(sys.argv[0]) or 'client'}-{os.getpid()}"
+        self.conn = Client(address, authkey=authkey)
+        self.lock = threading.Lock()
+        self.shm = None
+
+        self.conn.send({"op": "hello", "client": self.client_id})
+        info = self.conn.recv()
+        self.names = info["names"]
+        self.backend = f"server:{info['backend']}"
+
+    def _ensure_capacity(self, size):
+        if self.shm is not None and self.shm.size >= size:
+            return
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+        self.shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+
+    def predict(self, frames, conf=0.25, imgsz=None):
+        if isinstance(frames, np.ndarray):
+            frames = [frames]
+        frames = [np.ascontiguousarray(f, dtype=np.uint8) for f in frames]
+
+        with self.lock:
+            self._ensure_capacity(sum(f.nbytes for f in frames))
+            offset = 0
+            for frame in frames:
+                self.shm.buf[offset:offset + frame.nbytes] = frame.reshape(-1)
+                offset += frame.nbytes
+            self.conn.send({"op": "predict", "shm": self.shm.name, "shapes": [f.shape for f in frames],
+                            "conf": conf, "imgsz": imgsz or self.imgsz})
+            return self.conn.recv()
+
+    def get_stats(self):
+        with self.lock:
+            self.conn.send({"op": "stats"})
+            return self.conn.recv()
+
+    def close(self):
+        with self.lock:
+            try:
+                self.conn.send({"op": "close"})
+            except (OSError, BrokenPipeError):
+                pass
+            self.conn.close()
+            if self.shm is not None:
+                self.shm.close()
+                self.shm.unlink()
+                self.shm = None
+
+
+def load_model(weights, backend=DEFAULT_BACKEND, imgsz=640, separate_process=False):
+    """
+    Thin client kalau PCB_QC_SERVER diset dan server hidup. Kalau tidak, model
+    lokal: di proses worker sendiri (separate_process) atau di proses ini.
+    """
+    server = os.environ.get(SERVER_ENV)
+    if server:
+        try:
+            return InferenceClient(parse_address(server), imgsz=imgsz)
+        except (ConnectionRefusedError, OSError) as e:
+            print(f"Inference server {server} not reachable ({e}), loading model locally")
+    if separate_process:
+        return InferenceProcess(weights, backend, imgsz)
+    return load_engine(weights, backend, imgsz)
+
+
+if __name__ == "__main__":
+    # Pemakaian: python inference_server.py <weights.pt> [port]
+    weights = sys.argv[1] if len(sys.argv) > 1 else "KP_best5.pt"
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_ADDRESS[1]
+    InferenceServer(load_engine(weights), address=("localhost", port)).serve_forever()
@@ -0,0 +1,102 @@
+# Huruf yang sering terbaca sebagai digit (dan sebaliknya), biaya substitusinya murah.
+# Sengaja tanpa pasangan digit-digit (mis. 3/8, 1/7): "1802" dan "1002" sama-sama
+# nilai resistor yang valid, jadi tidak boleh dicocokkan satu sama lain
+CONFUSABLE = {
+    ("O", "0"), ("D", "0"), ("Q", "0"), ("U", "0"),
+    ("I", "1"), ("L", "1"), ("T", "1"),
+    ("Z", "2"), ("S", "5"), ("G", "6"), ("B", "8"),
+}
+CONFUSION_COST = 0.3
+# Karakter hilang/terpotong di tepi ROI lebih sering daripada digit yang benar-benar beda,
+# substitusi penuh dibuat mahal supaya resistor salah nilai (mis. 1003 vs 1002) tidak lolos
+INDEL_COST = 0.5
+EDIT_COST = 1.0
+# Kode EIA 3 dan 4 digit sama-sama valid ("100" = 10R, "1002" = 10k), jadi bacaan
+# sepanjang ini tidak boleh dicocokkan ke kode dengan jumlah karakter berbeda
+MAX_STRICT_LENGTH = 4
+
+
+def substitution_cost(a, b):
+    if a == b:
+        return 0.0
+    if (a, b) in CONFUSABLE or (b, a) in CONFUSABLE:
+        return CONFUSION_COST
+    return EDIT_COST
+
+
+def marking_distance(a, b):
+    """Edit distance (Levenshtein) dengan biaya substitusi murah untuk karakter yang mirip"""
+    prev = [j * INDEL_COST for j in range(len(b) + 1)]
+    for i, ca in enumerate(a, 1):
+        curr = [i * INDEL_COST]
+        for j, cb in enumerate(b, 1):
+            curr.append(min(
+                prev[j] + INDEL_COST,
+                curr[j - 1] + INDEL_COST,
+                prev[j - 1] + substitution_cost(ca, cb),
+            ))
+        prev = curr
+    return prev[-1]
+
+
+class MarkingIndex:
+    """
+    Index marking yang diharapkan untuk satu area.
+
+    lookup() mencari marking terdekat dengan marking_distance; untuk bacaan
+    pendek (<= MAX_STRICT_LENGTH) hanya kandidat dengan panjang sama yang
+    dipertimbangkan. Hasil untuk setiap string OCR disimpan (memo) karena
+    string yang sama sering muncul berulang dari frame ke frame.
+    """
+    def __init__(self, expected_markings, max_distance=0.6):
+        self.expected = sorted(set(m.upper() for m in expected_markings))
+        self.expected_set = set(self.expected)
+        self.max_distance = max_distance
+        self.memo = {}
+
+    def comparable(self, raw, marking):
+        return len(raw) == len(marking) or len(raw) > MAX_STRICT_LENGTH
+
+    def lookup(self, raw):
+        """
+        Returns: (marking, distance, reason)
+        reason: "exact", "matched", "empty", "no_candidate" (tidak ada kode
+        dengan panjang yang bisa dibandingkan), "too_far", atau "ambiguous"
+        (dua marking sama dekatnya). marking = None kecuali exact/matched;
+        distance = jarak ke kandidat terdekat.
+        """
+        if not raw:
+            return None, float("inf"), "empty"
+
+        raw = raw.upper().strip()
+        if raw in self.memo:
+            return self.memo[raw]
+
+        if raw in self.expected_set:
+            result = (raw, 0.0, "exact")
+        else:
+            scored = sorted((marking_distance(raw, m), m) for m in self.expected if self.comparable(raw, m))
+            best_dist, best = scored[0] if scored else (float("inf"), None)
+            if best is None:
+                result = (None, best_dist, "no_candidate")
+            elif best_dist > self.max_distance:
+                result = (None, best_dist, "too_far")
+            elif len(scored) > 1 and scored[1][0] == best_dist:
+                result = (None, best_dist, "ambiguous")
+            else:
+                result = (best, best_dist, "matched")
+
+        if len(self.memo) < 4096:
+            self.memo[raw] = result
+        return result
+
+    def match(self, raw):
+        """Returns: (marking, distance), lihat lookup()"""
+        marking, distance, _ = self.lookup(raw)
+        return marking, distance
+
+    def nearest(self, raw):
+        """Marking terdekat tanpa batas jarak (untuk pesan error)"""
+        if not raw or not self.expected:
+            return None, float("inf")
+        return min(((marking_distance(raw.upper(), m), m) for m in self.expected))[::-1]
@@ -0,0 +1,65 @@
+import cv2
+import numpy as np
+
+
+class SceneChangeDetector:
+    """
+    Deteksi apakah scene berubah dibanding frame terakhir yang di-inferensi.
+
+    Frame diperkecil ke thumbnail grayscale (thumb_size) lalu dibandingkan
+    dengan mean absolute difference. Selama board diam, deteksi sebelumnya
+    dipakai ulang; inferensi tetap dipaksa tiap `refresh_interval` frame.
+    """
+    def __init__(self, threshold=4.0, refresh_interval=15, thumb_size=(64, 48)):
+        self.threshold = threshold
+        self.refresh_interval = refresh_interval
+        self.thumb_size = thumb_size
+
+        self.reference = None
+        self.frames_since_refresh = 0
+        self.force_next = True
+        self.last_diff = 0.0
+
+        self.frames_processed = 0
+        self.frames_reused = 0
+
+    def thumbnail(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        thumb = cv2.resize(gray, self.thumb_size, interpolation=cv2.INTER_AREA)
+        return cv2.GaussianBlur(thumb, (3, 3), 0).astype(np.int16)
+
+    def should_process(self, frame):
+        """
+        Returns: True kalau frame perlu inferensi penuh, False kalau hasil
+        sebelumnya boleh dipakai ulang
+        """
+        thumb = self.thumbnail(frame)
+
+        if self.reference is None or self.force_next:
+            changed = True
+        else:
+            self.last_diff = float(np.mean(np.abs(thumb - self.reference)))
+            changed = (self.last_diff > self.threshold
+                       or self.frames_since_refresh >= self.refresh_interval)
+
+        if changed:
+            self.reference = thumb
+            self.frames_since_refresh = 0
+            self.force_next = False
+            self.frames_processed += 1
+        else:
+            self.frames_since_refresh += 1
+            self.frames_reused += 1
+        return changed
+
+    def force_refresh(self):
+        self.force_next = True
+
+    def get_stats(self):
+        total = self.frames_processed + self.frames_reused
+        return {
+            "processed": self.frames_processed,
+            "reused": self.frames_reused,
+            "reuse_rate": self.frames_reused / total if total else 0.0,
+            "last_diff": self.last_diff,
+        }
@@ -0,0 +1,174 @@
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+class OCRCache:
+    """
+    Cache hasil OCR resistor antar frame.
+
+    Resistor yang punya track_id (track confirmed dari ComponentTracker) di-key
+    per komponen fisik: (area, "track", track_id), jadi dua resistor yang
+    berdekatan tidak pernah berbagi hasil. Tanpa track_id, key = (area, cls_id,
+    grid_x, grid_y) dari titik tengah bbox yang dikuantisasi per `quantum`
+    pixel, jadi jitter beberapa pixel tetap kena entry yang sama.
+    Entry kadaluarsa setelah `ttl` detik, entry paling lama tidak dipakai dibuang
+    kalau jumlahnya melebihi `max_entries` (LRU). Cache dikosongkan saat area
+    berganti atau board bergeser (thumbnail frame berubah jauh).
+    """
+    def __init__(self, quantum=24, ttl=15.0, max_entries=64, move_threshold=18.0):
+        self.quantum = quantum
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.move_threshold = move_threshold
+
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.area = None
+        self.reference_thumb = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _center(self, bbox):
+        x1, y1, x2, y2 = bbox
+        return (x1 + x2) / 2.0, (y1 + y2) / 2.0
+
+    def make_key(self, area_name, cls_id, bbox, track_id=None):
+        if track_id is not None:
+            return (area_name, "track", int(track_id))
+        cx, cy = self._center(bbox)
+        return (area_name, cls_id, int(cx // self.quantum), int(cy // self.quantum))
+
+    def get(self, area_name, cls_id, bbox, track_id=None):
+        """
+        Entry untuk track_id (key persis), atau kalau tidak ada track_id,
+        entry terdekat di sel grid bbox dan 8 sel tetangganya
+        """
+        if track_id is not None:
+            return self._get_track(self.make_key(area_name, cls_id, bbox, track_id))
+
+        area, cls, gx, gy = self.make_key(area_name, cls_id, bbox)
+        cx, cy = self._center(bbox)
+        now = time.time()
+
+        with self.lock:
+            best_key, best_dist = None, float(self.quantum)
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    key = (area, cls, gx + dx, gy + dy)
+                    entry = self.entries.get(key)
+                    if entry is None:
+                        continue
+                    if now - entry["timestamp"] > self.ttl:
+                        del self.entries[key]
+                        self.evictions += 1
+                        continue
+                    ex, ey = entry["center"]
+                    dist = ((ex - cx) ** 2 + (ey - cy) ** 2) ** 0.5
+                    if dist <= best_dist:
+                        best_key, best_dist = key, dist
+
+            if best_key is None:
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(best_key)
+            self.hits += 1
+            return self.entries[best_key]
+
+    def _get_track(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and time.time() - entry["timestamp"] > self.ttl:
+                del self.entries[key]
+                self.evictions += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def get_key(self, key):
+        """Ambil entry dengan key persis (tanpa hitung hit/miss)"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and time.time() - entry["timestamp"] > self.ttl:
+                del self.entries[key]
+                self.evictions += 1
+                return None
+            return entry
+
+    def put(self, key, bbox, data):
+        area_name = key[0]
+        with self.lock:
+            if self.area is not None and area_name != self.area:
+                return
+
+            entry = dict(data)
+            entry["key"] = key
+            entry["bbox"] = bbox
+            entry["center"] = self._center(bbox)
+            entry["timestamp"] = time.time()
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def values(self):
+        now = time.time()
+        with self.lock:
+            return [e for e in self.entries.values() if now - e["timestamp"] <= self.ttl]
+
+    def invalidate(self):
+        with self.lock:
+            if self.entries:
+                self.invalidations += 1
+            self.entries.clear()
+            self.reference_thumb = None
+
+    def set_area(self, area_name):
+        if area_name != self.area:
+            self.invalidate()
+            self.area = area_name
+
+    def check_board(self, frame):
+        """
+        Bandingkan thumbnail grayscale frame dengan referensi. Kalau bedanya
+        di atas move_threshold (board digeser / diganti) cache dikosongkan.
+        Returns: True kalau cache baru saja di-invalidate
+        """
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        thumb = cv2.resize(gray, (32, 24), interpolation=cv2.INTER_AREA).astype(np.int16)
+
+        if self.reference_thumb is None:
+            self.reference_thumb = thumb
+            return False
+
+        diff = float(np.mean(np.abs(thumb - self.reference_thumb)))
+        if diff > self.move_threshold:
+            self.invalidate()
+            self.reference_thumb = thumb
+            return True
+        return False
+
+    def get_stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
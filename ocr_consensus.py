@@ -0,0 +1,56 @@
+from collections import deque
+
+
+class MarkingConsensus:
+    """
+    Voting marking resistor dari beberapa frame.
+
+    Setiap bacaan OCR jadi satu vote dengan bobot = confidence OCR, hanya
+    `window` bacaan terakhir yang dihitung. Dianggap converged kalau sudah ada
+    minimal `min_reads` bacaan dan satu marking menguasai >= `dominance` dari
+    total bobot, setelah itu resistor tidak perlu di-OCR lagi.
+    """
+    def __init__(self, window=7, min_reads=3, dominance=0.7, min_weight=1.5):
+        self.window = window
+        self.min_reads = min_reads
+        self.dominance = dominance
+        self.min_weight = min_weight
+        self.reads = deque(maxlen=window)
+
+    def add(self, marking, conf):
+        if not marking:
+            return self.converged
+        self.reads.append((marking, float(conf)))
+        return self.converged
+
+    def votes(self):
+        weights = {}
+        for marking, conf in self.reads:
+            weights[marking] = weights.get(marking, 0.0) + conf
+        return weights
+
+    def best(self):
+        """
+        Returns: (marking, share, mean_conf)
+        share = bobot marking pemenang / total bobot
+        """
+        weights = self.votes()
+        if not weights:
+            return None, 0.0, 0.0
+
+        marking = max(weights, key=weights.get)
+        total = sum(weights.values())
+        confs = [conf for m, conf in self.reads if m == marking]
+        return marking, weights[marking] / total, sum(confs) / len(confs)
+
+    @property
+    def converged(self):
+        if len(self.reads) < self.min_reads:
+            return False
+        weights = self.votes()
+        marking = max(weights, key=weights.get)
+        total = sum(weights.values())
+        return weights[marking] >= self.min_weight and weights[marking] / total >= self.dominance
+
+    def reset(self):
+        self.reads.clear()
@@ -1,10 +1,32 @@
+import bisect
+import os
 import cv2
 import numpy as np
 import easyocr
 
+from smd_digit_ocr import DigitTemplateOCR
+from marking_matcher import MarkingIndex
+
 class resistor_OCR:
     def __init__(self):
         self. reader = easyocr.Reader(['en'], gpu=False)
+
+        # "recognize": ROI dari YOLO langsung jadi text box (tanpa CRAFT detector),
+        # readtext penuh hanya dipakai kalau confidence di bawah recognize_min_conf.
+        # "readtext": selalu detector + recognizer seperti sebelumnya.
+        self.ocr_mode = "recognize"
+        self.recognize_min_conf = 0.6
+        self.ocr_allowlist = "0123456789R"
+
+        # Fast path: template matching digit, EasyOCR hanya kalau confidence-nya rendah.
+        # Template dibuat dari crop produksi: GUI menyimpan crop yang sudah terbaca benar
+        # ke ocr_crops/ (OCR_CROP_DIR), lalu python scripts/fit_digit_templates.py.
+        # Selama file ini belum ada semua resistor dibaca EasyOCR
+        self.digit_templates_path = "digit_templates.npz"
+        self.digit_min_conf = 0.8
+        self.digit_ocr = None
+        if os.path.exists(self.digit_templates_path):
+            self.digit_ocr = DigitTemplateOCR.load(self.digit_templates_path)
         self.resistor_database={
             "Area 1":{
                 "Resistor": ["1002","1002"],
@@ -25,6 +47,11 @@ class resistor_OCR:
             }
         }
 
+        # Index marking per area untuk nearest-match hasil OCR yang meleset sedikit
+        self.marking_index = {
+            area: MarkingIndex(data["Resistor"]) for area, data in self.resistor_database.items()
+        }
+
     # def preprocess_ocr(self, image):
     #     if len(image.shape) == 3:
     #         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
@@ -78,43 +105,145 @@ class resistor_OCR:
         
     #     return None, 0.0
     
-    def read_classify_resistor(self, bbox, frame):
-        best = (None, 0)
-
+    def crop_resistor_roi(self, bbox, frame, margin=15):
         x1, y1, x2, y2 = map(int, bbox)
-        margin = 15
         y1 = max(0, y1 - margin)
         x1 = max(0, x1 - margin)
         y2 = min(frame.shape[0], y2 + margin)
         x2 = min(frame.shape[1], x2 + margin)
+        return frame[y1:y2, x1:x2]
 
-        roi = frame[y1:y2, x1:x2]
+    def read_classify_resistor(self, bbox, frame):
+        roi = self.crop_resistor_roi(bbox, frame)
         if roi.size == 0:
             return None, 0
 
-        processed = self.preprocess_ocr(roi)
+        return self.read_resistor_roi(roi)
+
+    def read_resistor_roi(self, roi):
+        if roi.size == 0:
+            return None, 0
+        return self.read_resistor_rois([roi])[0]
+
+    def read_classify_resistors(self, bboxes, frame):
+        """
+        OCR semua resistor dalam satu frame sekaligus (satu panggilan EasyOCR)
+        Returns: [(marking, conf), ...] sesuai urutan bboxes
+        """
+        rois = [self.crop_resistor_roi(bbox, frame) for bbox in bboxes]
+        return self.read_resistor_rois(rois)
+
+    def read_resistor_rois(self, rois):
+        outputs = [(None, 0)] * len(rois)
+        valid = [i for i, roi in enumerate(rois) if roi.size > 0]
+        if not valid:
+            return outputs
+
+        # Fast path digit template, yang confidence-nya cukup tidak perlu EasyOCR
+        if self.digit_ocr is not None:
+            remaining = []
+            for i in valid:
+                marking, conf = self.digit_ocr.read(rois[i])
+                if marking and conf >= self.digit_min_conf:
+                    outputs[i] = (marking, conf)
+                else:
+                    remaining.append(i)
+            valid = remaining
+            if not valid:
+                return outputs
+
+        processed = [self.preprocess_ocr(rois[i]) for i in valid]
+
+        if self.ocr_mode == "recognize":
+            results = self.recognize_processed(processed)
+            fallback = [j for j, (marking, conf) in enumerate(results)
+                        if marking is None or conf < self.recognize_min_conf]
+        else:
+            results = [(None, 0)] * len(processed)
+            fallback = list(range(len(processed)))
+
+        # Fallback ke readtext penuh (detector + recognizer)
+        if fallback:
+            full_results = self.readtext_processed([processed[j] for j in fallback])
+            for j, res in zip(fallback, full_results):
+                if res[1] > results[j][1]:
+                    results[j] = res
+
+        for i, res in zip(valid, results):
+            outputs[i] = res
+        return outputs
+
+    def recognize_processed(self, processed):
+        """
+        Recognizer saja, ROI dianggap satu text box. Orientasi 180 derajat ikut dicoba
+        untuk board yang terpasang terbalik.
+        """
+        outputs = [(None, 0)] * len(processed)
+
+        # Tumpuk semua ROI vertikal jadi satu strip -> satu panggilan recognize
+        max_w = max(img.shape[1] for img in processed)
+        offsets = []
+        rows = []
+        y = 0
+        for img in processed:
+            offsets.append(y)
+            rows.append(cv2.copyMakeBorder(img, 0, 0, 0, max_w - img.shape[1], cv2.BORDER_CONSTANT, value=0))
+            y += img.shape[0]
+        strip = np.vstack(rows)
+        boxes = [[0, img.shape[1], off, off + img.shape[0]] for img, off in zip(processed, offsets)]
 
         try:
-            results = self.reader.readtext(processed, detail=1)
-
-            candidates = []
-            for _, text, conf in results:
-                cleaned = "".join(filter(str.isalnum, text))
-                cleaned = (
-                    cleaned.replace("I","1")
-                            .replace("l","1")
-                            .replace("O","0")
-                            .replace("o","0")
-                )
-                if len(cleaned) >= 3 and conf > 0.4:
-                    candidates.append((cleaned, conf))
-
-            best = max(candidates, key=lambda x: x[1], default=(None, 0))
+            results = self.reader.recognize(
+                strip, horizontal_list=boxes, free_list=[], detail=1,
+                batch_size=len(boxes), rotation_info=[180], allowlist=self.ocr_allowlist
+            )
+            for result in results:
+                top = min(pt[1] for pt in result[0])
+                idx = bisect.bisect_right(offsets, top) - 1
+                candidate = self.best_candidate([result])
+                if candidate[1] > outputs[idx][1]:
+                    outputs[idx] = candidate
+        except Exception as e:
+            print(f"OCR Error: {e}")
+
+        return outputs
+
+    def readtext_processed(self, processed):
+        outputs = [(None, 0)] * len(processed)
+
+        # readtext_batched butuh ukuran sama -> pad ke ukuran terbesar
+        max_h = max(img.shape[0] for img in processed)
+        max_w = max(img.shape[1] for img in processed)
+        padded = [
+            cv2.copyMakeBorder(img, 0, max_h - img.shape[0], 0, max_w - img.shape[1], cv2.BORDER_REPLICATE)
+            for img in processed
+        ]
 
+        try:
+            batch_results = self.reader.readtext_batched(
+                padded, n_width=max_w, n_height=max_h, batch_size=len(padded), detail=1
+            )
+            for i, results in enumerate(batch_results):
+                outputs[i] = self.best_candidate(results)
         except Exception as e:
             print(f"OCR Error: {e}")
 
-        return best[0], best[1]
+        return outputs
+
+    def best_candidate(self, results):
+        candidates = []
+        for _, text, conf in results:
+            cleaned = "".join(filter(str.isalnum, text))
+            cleaned = (
+                cleaned.replace("I","1")
+                        .replace("l","1")
+                        .replace("O","0")
+                        .replace("o","0")
+            )
+            if len(cleaned) >= 3 and conf > 0.4:
+                candidates.append((cleaned, conf))
+
+        return max(candidates, key=lambda x: x[1], default=(None, 0))
 
     
     def decode_resistor_marking(self, marking):
@@ -184,6 +313,14 @@ class resistor_OCR:
         area_data = self.resistor_database[area_name]
         expected_markings = area_data["Resistor"]
         designators = area_data["footprint"]
+
+        # Cocokkan ke marking terdekat (mis. "1O02" -> "1002"); "100" tidak
+        # dipaksa jadi "1002" karena kode 3 digit juga valid
+        raw_marking = marking
+        matched, distance, match_reason = self.marking_index[area_name].lookup(marking)
+        if matched is not None:
+            marking = matched
+            decoded = self.decode_resistor_marking(marking)
         
         # Cek apakah marking ada di expected list
         if marking in expected_markings:
@@ -204,19 +341,39 @@ class resistor_OCR:
                 "detected_value": decoded['value_str'],
                 "expected_count": count_expected,
                 "designator": designator,
-                "decoded": decoded
+                "decoded": decoded,
+                "raw_marking": raw_marking,
+                "distance": distance
             }
         else:
+            nearest, nearest_distance = self.marking_index[area_name].nearest(marking)
+            if match_reason == "ambiguous":
+                reason = "Ambiguous: several expected markings equally close"
+            elif match_reason == "no_candidate":
+                reason = "No expected marking with the same number of digits"
+            else:
+                reason = f"No expected marking within distance {self.marking_index[area_name].max_distance}"
             return {
                 "status": "error",
-                "message": f"Wrong: {marking} ({decoded['value_str']})\n   Expected: {', '.join(set(expected_markings))}",
+                "message": f"Wrong: {marking} ({decoded['value_str']})\n   Expected: {', '.join(set(expected_markings))}"
+                           f"\n   {reason} (nearest: {nearest}, {nearest_distance:.1f})",
                 "match": False,
                 "detected_marking": marking,
                 "detected_value": decoded['value_str'],
                 "expected_markings": expected_markings,
-                "decoded": decoded
+                "decoded": decoded,
+                "nearest_marking": nearest,
+                "match_reason": match_reason,
+                "distance": nearest_distance
             }
     
+    def designator_markings(self, area_name):
+        """{designator: marking} untuk area, dari pasangan Resistor/footprint di database"""
+        area_data = self.resistor_database.get(area_name)
+        if not area_data:
+            return {}
+        return {d.strip(): m for m, d in zip(area_data["Resistor"], area_data["footprint"])}
+
     def get_area_resistor_summary(self, area_name):
         if area_name not in self.resistor_database:
             return "No resistor data for this area"
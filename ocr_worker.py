@@ -0,0 +1,205 @@
+import multiprocessing as mp
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from ocr_resistor import resistor_OCR
+
+# OCR instance per proses worker (mode "process")
+_process_ocr = None
+
+
+def _init_process_ocr():
+    global _process_ocr
+    _process_ocr = resistor_OCR()
+
+
+def _read_in_process(rois):
+    return _process_ocr.read_resistor_rois(rois)
+
+
+class OCRWorkerPool:
+    """
+    Jalankan OCR resistor di luar thread deteksi.
+
+    Job disimpan di antrian terbatas (max_queue). Kalau antrian penuh, job paling
+    lama dibuang (backpressure), job baru dengan key yang sama menimpa job lama,
+    dan job yang sudah lebih tua dari max_age detik tidak dikerjakan lagi.
+    Worker mengambil sampai max_batch job sekaligus (biasanya semua resistor
+    dari satu frame) dan membacanya dalam satu panggilan EasyOCR.
+    Hasil diambil dari thread deteksi lewat pop_results().
+    """
+    def __init__(self, resistor_ocr=None, num_workers=1, mode="thread", max_queue=8, max_age=1.0,
+                 max_batch=4):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown OCR worker mode: {mode}")
+
+        self.resistor_ocr = resistor_ocr
+        self.num_workers = max(1, num_workers)
+        self.mode = mode
+        self.max_queue = max_queue
+        self.max_age = max_age
+        self.max_batch = max_batch
+
+        self.cond = threading.Condition()
+        self.jobs = OrderedDict()      # key -> job
+        self.in_flight = set()
+        self.results = []
+        self.is_running = False
+        self.threads = []
+        self.executor = None
+
+        # Counter
+        self.submitted = 0
+        self.completed = 0
+        self.batches = 0
+        self.dropped_full = 0
+        self.dropped_stale = 0
+        self.replaced = 0
+
+    def start(self):
+        if self.is_running:
+            return
+        if self.mode == "process":
+            # spawn, bukan fork: torch/EasyOCR dan thread-nya sudah jalan di proses GUI
+            self.executor = ProcessPoolExecutor(max_workers=self.num_workers, initializer=_init_process_ocr,
+                                                mp_context=mp.get_context("spawn"))
+        elif self.resistor_ocr is None:
+            self.resistor_ocr = resistor_OCR()
+
+        self.is_running = True
+        for _ in range(self.num_workers):
+            thread = threading.Thread(target=self._worker_loop, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self):
+        with self.cond:
+            self.is_running = False
+            self.jobs.clear()
+            self.cond.notify_all()
+        for thread in self.threads:
+            thread.join(timeout=1.0)
+        self.threads = []
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def submit(self, key, roi, bbox, area_name, frame_seq=0):
+        """
+        Masukkan ROI resistor ke antrian OCR.
+        Returns: False kalau key yang sama sedang diproses (job tidak dimasukkan)
+        """
+        return self.submit_batch([(key, roi, bbox, area_name, frame_seq)])[0]
+
+    def submit_batch(self, items):
+        """
+        Masukkan semua ROI resistor dari satu frame sekaligus supaya worker
+        mengambilnya dalam satu batch.
+        items: [(key, roi, bbox, area_name, frame_seq), ...]
+        """
+        now = time.time()
+        accepted = []
+
+        with self.cond:
+            for key, roi, bbox, area_name, frame_seq in items:
+                if not self.is_running or key in self.in_flight:
+                    accepted.append(False)
+                    continue
+
+                if key in self.jobs:
+                    del self.jobs[key]
+                    self.replaced += 1
+                elif len(self.jobs) >= self.max_queue:
+                    self.jobs.popitem(last=False)
+                    self.dropped_full += 1
+
+                self.jobs[key] = {
+                    "key": key,
+                    "roi": roi.copy(),
+                    "bbox": bbox,
+                    "area": area_name,
+                    "frame_seq": frame_seq,
+                    "submitted_at": now,
+                }
+                self.submitted += 1
+                accepted.append(True)
+            self.cond.notify_all()
+        return accepted
+
+    def is_pending(self, key):
+        with self.cond:
+            return key in self.jobs or key in self.in_flight
+
+    def pop_results(self):
+        """Ambil semua hasil OCR yang sudah selesai sejak pemanggilan terakhir"""
+        with self.cond:
+            results = self.results
+            self.results = []
+        return results
+
+    def _next_jobs(self):
+        with self.cond:
+            while self.is_running:
+                batch = []
+                while self.jobs and len(batch) < self.max_batch:
+                    _, job = self.jobs.popitem(last=False)
+                    if time.time() - job["submitted_at"] > self.max_age:
+                        self.dropped_stale += 1
+                        continue
+                    self.in_flight.add(job["key"])
+                    batch.append(job)
+                if batch:
+                    return batch
+                self.cond.wait()
+        return []
+
+    def _worker_loop(self):
+        while True:
+            batch = self._next_jobs()
+            if not batch:
+                break
+
+            rois = [job["roi"] for job in batch]
+            outputs = [(None, 0)] * len(batch)
+            try:
+                if self.mode == "process":
+                    outputs = self.executor.submit(_read_in_process, rois).result()
+                else:
+                    outputs = self.resistor_ocr.read_resistor_rois(rois)
+            except Exception as e:
+                print(f"OCR Worker Error: {e}")
+
+            with self.cond:
+                for job in batch:
+                    self.in_flight.discard(job["key"])
+                if not self.is_running:
+                    break
+                now = time.time()
+                for job, (marking, conf) in zip(batch, outputs):
+                    self.results.append({
+                        "key": job["key"],
+                        "roi": job["roi"],
+                        "bbox": job["bbox"],
+                        "area": job["area"],
+                        "frame_seq": job["frame_seq"],
+                        "marking": marking,
+                        "confidence": conf,
+                        "latency": now - job["submitted_at"],
+                    })
+                self.completed += len(batch)
+                self.batches += 1
+
+    def get_stats(self):
+        with self.cond:
+            return {
+                "queued": len(self.jobs),
+                "in_flight": len(self.in_flight),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "batches": self.batches,
+                "dropped_full": self.dropped_full,
+                "dropped_stale": self.dropped_stale,
+                "replaced": self.replaced,
+            }
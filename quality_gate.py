@@ -0,0 +1,89 @@
+import cv2
+import numpy as np
+
+
+class FrameQualityGate:
+    """
+    Cek kualitas frame sebelum YOLO dan OCR.
+
+    Skor dihitung pada frame yang diperkecil (lebar `sample_width`):
+    - sharpness   : variance Laplacian (rendah = blur, board sedang digerakkan)
+    - brightness  : rata-rata intensitas grayscale
+    - saturated   : fraksi pixel yang clipping (terlalu terang / pantulan)
+    ROI resistor dicek dengan threshold yang lebih ketat sebelum OCR.
+    """
+    def __init__(self, min_sharpness=40.0, min_brightness=35.0, max_brightness=225.0,
+                 max_saturated=0.2, min_roi_sharpness=80.0, sample_width=320):
+        self.min_sharpness = min_sharpness
+        self.min_brightness = min_brightness
+        self.max_brightness = max_brightness
+        self.max_saturated = max_saturated
+        self.min_roi_sharpness = min_roi_sharpness
+        self.sample_width = sample_width
+
+        self.frames_checked = 0
+        self.skipped = {"blur": 0, "dark": 0, "bright": 0, "saturated": 0}
+        self.rois_checked = 0
+        self.rois_skipped = 0
+        self.last_scores = None
+
+    def _gray(self, image):
+        if image.ndim == 3:
+            return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        return image
+
+    def score(self, gray):
+        return {
+            "sharpness": float(cv2.Laplacian(gray, cv2.CV_64F).var()),
+            "brightness": float(gray.mean()),
+            "saturated": float(np.count_nonzero(gray >= 250)) / gray.size,
+        }
+
+    def check(self, frame):
+        """
+        Returns: (ok, reason, scores), reason = None kalau frame layak diproses
+        """
+        h, w = frame.shape[:2]
+        if w > self.sample_width:
+            scale = self.sample_width / w
+            frame = cv2.resize(frame, (self.sample_width, max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+
+        scores = self.score(self._gray(frame))
+        self.last_scores = scores
+        self.frames_checked += 1
+
+        reason = None
+        if scores["brightness"] < self.min_brightness:
+            reason = "dark"
+        elif scores["brightness"] > self.max_brightness:
+            reason = "bright"
+        elif scores["saturated"] > self.max_saturated:
+            reason = "saturated"
+        elif scores["sharpness"] < self.min_sharpness:
+            reason = "blur"
+
+        if reason is not None:
+            self.skipped[reason] += 1
+        return reason is None, reason, scores
+
+    def check_roi(self, roi):
+        """Gate per ROI resistor sebelum OCR (resolusi penuh, threshold lebih ketat)"""
+        if roi.size == 0:
+            return False
+        self.rois_checked += 1
+        scores = self.score(self._gray(roi))
+        ok = (scores["sharpness"] >= self.min_roi_sharpness
+              and self.min_brightness <= scores["brightness"] <= self.max_brightness
+              and scores["saturated"] <= self.max_saturated)
+        if not ok:
+            self.rois_skipped += 1
+        return ok
+
+    def get_stats(self):
+        return {
+            "frames_checked": self.frames_checked,
+            "frames_skipped": sum(self.skipped.values()),
+            "skipped": dict(self.skipped),
+            "rois_checked": self.rois_checked,
+            "rois_skipped": self.rois_skipped,
+        }
@@ -0,0 +1,186 @@
+import json
+import os
+import shutil
+
+import cv2
+import numpy as np
+from ultralytics import YOLO
+
+from class_taxonomy import get_taxonomy
+from inference_engine import engine_cache_path, export_model
+from reference_images import IMAGE_EXTENSIONS
+QUANTIZE_BACKENDS = ("onnx", "openvino")
+
+
+def letterbox(image, imgsz=640):
+    """Resize dengan rasio tetap + padding abu-abu (114), sama seperti preprocessing YOLO"""
+    h, w = image.shape[:2]
+    scale = min(imgsz / h, imgsz / w)
+    new_w, new_h = int(round(w * scale)), int(round(h * scale))
+    resized = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    top = (imgsz - new_h) // 2
+    left = (imgsz - new_w) // 2
+    return cv2.copyMakeBorder(resized, top, imgsz - new_h - top, left, imgsz - new_w - left,
+                              cv2.BORDER_CONSTANT, value=(114, 114, 114))
+
+
+def to_input(image, imgsz=640):
+    """BGR uint8 -> tensor NCHW float32 RGB 0..1"""
+    img = letterbox(image, imgsz)[:, :, ::-1].transpose(2, 0, 1)
+    return np.ascontiguousarray(img, dtype=np.float32)[None] / 255.0
+
+
+def calibration_files(frames_dir, limit=300):
+    """Sampel merata dari frame yang sudah di-capture (maksimal `limit`)"""
+    files = sorted(os.path.join(frames_dir, n) for n in os.listdir(frames_dir)
+                   if n.lower().endswith(IMAGE_EXTENSIONS))
+    if len(files) > limit:
+        files = [files[i] for i in np.linspace(0, len(files) - 1, limit).astype(int)]
+    return files
+
+
+def quantize_onnx(fp32_path, int8_path, files, imgsz=640):
+    """Static INT8 (QDQ) dengan ONNX Runtime, metadata ultralytics ikut disalin"""
+    import onnx
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+
+    input_name = onnx.load(fp32_path, load_external_data=False).graph.input[0].name
+
+    class FrameReader(CalibrationDataReader):
+        def __init__(self):
+            self.files = iter(files)
+
+        def get_next(self):
+            for path in self.files:
+                image = cv2.imread(path)
+                if image is not None:
+                    return {input_name: to_input(image, imgsz)}
+            return None
+
+    quantize_static(fp32_path, int8_path, FrameReader(), quant_format=QuantFormat.QDQ,
+                    per_channel=True, activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8)
+
+    # YOLO membaca names/imgsz dari metadata_props
+    fp32 = onnx.load(fp32_path, load_external_data=False)
+    int8 = onnx.load(int8_path)
+    del int8.metadata_props[:]
+    int8.metadata_props.extend(fp32.metadata_props)
+    onnx.save(int8, int8_path)
+
+
+def quantize_openvino(fp32_dir, int8_dir, files, imgsz=640):
+    """Post-training INT8 dengan NNCF, metadata.yaml ultralytics ikut disalin"""
+    import nncf
+    import openvino as ov
+
+    xml = next(os.path.join(fp32_dir, n) for n in os.listdir(fp32_dir) if n.endswith(".xml"))
+    model = ov.Core().read_model(xml)
+
+    def transform(path):
+        return to_input(cv2.imread(path), imgsz)
+
+    valid = [f for f in files if cv2.imread(f) is not None]
+    quantized = nncf.quantize(model, nncf.Dataset(valid, transform), subset_size=len(valid),
+                              preset=nncf.QuantizationPreset.MIXED)
+
+    os.makedirs(int8_dir, exist_ok=True)
+    ov.save_model(quantized, os.path.join(int8_dir, os.path.basename(xml)))
+    shutil.copy(os.path.join(fp32_dir, "metadata.yaml"), os.path.join(int8_dir, "metadata.yaml"))
+
+
+def per_class_recall(model_path, data_yaml, imgsz=640):
+    """
+    Validasi ultralytics pada dataset berlabel.
+    Returns: {cls_id: recall}, hanya class yang punya ground truth di dataset
+    """
+    metrics = YOLO(model_path, task="detect").val(data=data_yaml, imgsz=imgsz, batch=1,
+                                                  plots=False, verbose=False)
+    box = metrics.box
+    return {int(cls_id): float(box.r[i]) for i, cls_id in enumerate(box.ap_class_index)}
+
+
+def check_defect_recall(names, baseline, candidate, max_drop=0.02):
+    """
+    Guardrail: recall class defect ("No ...", "Missalignment", "wrong component")
+    model INT8 tidak boleh turun lebih dari max_drop dibanding model FP32.
+    Class defect tanpa ground truth di dataset validasi tidak bisa dicek,
+    jadi guardrail gagal (termasuk kalau tidak ada class defect sama sekali).
+    Returns: (ok, rows, no_ground_truth)
+    rows = [(nama, recall fp32, recall int8, turun?)], no_ground_truth = [nama]
+    """
+    taxonomy = get_taxonomy(names)
+    rows = []
+    no_ground_truth = []
+    for cls_id in sorted(names):
+        if not taxonomy.is_defect[cls_id]:
+            continue
+        if cls_id not in baseline:
+            no_ground_truth.append(names[cls_id])
+            continue
+        base = baseline[cls_id]
+        cand = candidate.get(cls_id, 0.0)
+        rows.append((names[cls_id], base, cand, base - cand > max_drop))
+    ok = bool(rows) and not no_ground_truth and not any(row[3] for row in rows)
+    return ok, rows, no_ground_truth
+
+
+def quantize_model(weights, backend, frames_dir, data_yaml, imgsz=640, limit=300, max_drop=0.02):
+    """
+    Export FP32 -> kalibrasi INT8 dari frame capture -> validasi recall defect.
+    Model INT8 hanya disimpan di engine_cache kalau lolos guardrail.
+    Returns: report dict
+    """
+    if backend not in QUANTIZE_BACKENDS:
+        raise ValueError(f"Unknown backend {backend}, expected one of {QUANTIZE_BACKENDS}")
+    files = calibration_files(frames_dir, limit)
+    if not files:
+        raise ValueError(f"No calibration frames in {frames_dir}")
+
+    fp32_path = export_model(weights, backend, imgsz)
+    int8_path = engine_cache_path(weights, f"{backend}_int8", imgsz)
+    candidate_path = os.path.join(os.path.dirname(int8_path), "candidate_" + os.path.basename(int8_path))
+
+    if backend == "onnx":
+        quantize_onnx(fp32_path, candidate_path, files, imgsz)
+    else:
+        quantize_openvino(fp32_path, candidate_path, files, imgsz)
+
+    names = YOLO(weights).names
+    baseline = per_class_recall(fp32_path, data_yaml, imgsz)
+    candidate = per_class_recall(candidate_path, data_yaml, imgsz)
+    ok, rows, no_ground_truth = check_defect_recall(names, baseline, candidate, max_drop)
+    if not rows:
+        reason = "no defect class in validation set"
+    elif no_ground_truth:
+        reason = "defect classes without ground truth: " + ", ".join(no_ground_truth)
+    elif not ok:
+        reason = f"defect recall dropped more than {max_drop}"
+    else:
+        reason = None
+
+    if ok:
+        if os.path.isdir(int8_path):
+            shutil.rmtree(int8_path)
+        shutil.move(candidate_path, int8_path)
+    elif os.path.isdir(candidate_path):
+        shutil.rmtree(candidate_path)
+    elif os.path.exists(candidate_path):
+        os.remove(candidate_path)
+
+    report = {
+        "weights": weights,
+        "backend": backend,
+        "calibration_frames": len(files),
+        "max_drop": max_drop,
+        "accepted": ok,
+        "reason": reason,
+        "model": int8_path if ok else None,
+        "defect_recall": [
+            {"class": name, "fp32": base, "int8": cand, "failed": failed}
+            for name, base, cand, failed in rows
+        ],
+        "no_ground_truth": no_ground_truth,
+    }
+    with open(os.path.join(os.path.dirname(int8_path), f"quantization_{backend}.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    return report
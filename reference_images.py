@@ -0,0 +1,51 @@
+import os
+
+import numpy as np
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+REFERENCE_DIR = "area_references"
+
+
+def reference_files(reference_dir=REFERENCE_DIR):
+    """Returns: [(area, path), ...] dari <reference_dir>/<Area N>/*.png"""
+    files = []
+    if not os.path.isdir(reference_dir):
+        return files
+    for area in sorted(os.listdir(reference_dir)):
+        area_dir = os.path.join(reference_dir, area)
+        if not os.path.isdir(area_dir):
+            continue
+        for name in sorted(os.listdir(area_dir)):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                files.append((area, os.path.join(area_dir, name)))
+    return files
+
+
+def golden_files(reference_dir=REFERENCE_DIR):
+    """Returns: {area: path} golden.png per area, atau gambar pertama di foldernya"""
+    files = {}
+    for area, path in reference_files(reference_dir):
+        is_golden = os.path.splitext(os.path.basename(path))[0].lower() == "golden"
+        if area not in files or is_golden:
+            files[area] = path
+    return files
+
+
+def files_signature(files):
+    """Area + path + mtime + ukuran, cukup untuk tahu referensi berubah"""
+    return "|".join(f"{area}:{path}:{os.path.getmtime(path):.0f}:{os.path.getsize(path)}"
+                    for area, path in files)
+
+
+def load_cache(cache_path, signature):
+    """Returns: {nama: array} dari cache .npz, atau None kalau tidak ada / signature beda"""
+    if not os.path.exists(cache_path):
+        return None
+    with np.load(cache_path) as data:
+        if str(data["signature"]) != signature:
+            return None
+        return {key: data[key] for key in data.files}
+
+
+def save_cache(cache_path, signature, **arrays):
+    np.savez_compressed(cache_path, signature=signature, **arrays)
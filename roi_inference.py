@@ -0,0 +1,101 @@
+import json
+import os
+
+import cv2
+import numpy as np
+
+AREA_ROIS_FILE = "area_rois.json"
+
+
+def load_area_rois(path=AREA_ROIS_FILE):
+    """ROI per area di koordinat golden image: {"Area 1": [x1, y1, x2, y2], ...}"""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return {area: [float(v) for v in rect] for area, rect in json.load(f).items()}
+
+
+class RoiInference:
+    """
+    Jalankan YOLO hanya pada crop area yang aktif.
+
+    ROI area diambil dari area_rois.json (koordinat golden), atau kalau tidak
+    ada, seluruh golden image area. Keduanya dipetakan ke frame lewat
+    homography BoardRegistration, lalu crop diinferensi dengan `imgsz` yang
+    lebih kecil dan box dikembalikan ke koordinat frame. Kalau ROI hampir
+    selebar frame (tidak ada untungnya) atau belum teregistrasi, inferensi
+    frame penuh dengan `full_imgsz`.
+    """
+    def __init__(self, imgsz=480, full_imgsz=640, margin=0.05, max_fraction=0.8, min_size=64):
+        self.imgsz = imgsz
+        self.full_imgsz = full_imgsz
+        self.margin = margin
+        self.max_fraction = max_fraction
+        self.min_size = min_size
+        self.area_rois = load_area_rois()
+
+        self.roi_frames = 0
+        self.full_frames = 0
+        self.fraction_sum = 0.0
+        self.last_rect = None
+
+    def select(self, frame_shape, area_name, registration):
+        """Returns: (x1, y1, x2, y2) di frame, atau None untuk frame penuh"""
+        if area_name is None or registration is None or registration.area != area_name:
+            return None
+        if registration.homography is None:
+            return None
+
+        if area_name in self.area_rois:
+            x1, y1, x2, y2 = self.area_rois[area_name]
+        else:
+            w, h = registration.golden[area_name]["size"]
+            x1, y1, x2, y2 = 0, 0, w, h
+        corners = registration.to_frame([[x1, y1], [x2, y1], [x2, y2], [x1, y2]])
+
+        frame_h, frame_w = frame_shape[:2]
+        rx1, ry1 = corners.min(axis=0)
+        rx2, ry2 = corners.max(axis=0)
+        pad_x = (rx2 - rx1) * self.margin
+        pad_y = (ry2 - ry1) * self.margin
+        rx1 = int(max(0, rx1 - pad_x))
+        ry1 = int(max(0, ry1 - pad_y))
+        rx2 = int(min(frame_w, rx2 + pad_x))
+        ry2 = int(min(frame_h, ry2 + pad_y))
+
+        if rx2 - rx1 < self.min_size or ry2 - ry1 < self.min_size:
+            return None
+        if (rx2 - rx1) * (ry2 - ry1) > self.max_fraction * frame_w * frame_h:
+            return None
+        return rx1, ry1, rx2, ry2
+
+    def predict(self, model, frame, rect, conf):
+        """
+        Inferensi pada crop rect (atau frame penuh kalau rect None)
+        Returns: (xyxy, conf, cls) di koordinat frame
+        """
+        self.last_rect = rect
+        if rect is None:
+            self.full_frames += 1
+            return model.predict(frame, conf=conf, imgsz=self.full_imgsz)[0]
+
+        x1, y1, x2, y2 = rect
+        crop = np.ascontiguousarray(frame[y1:y2, x1:x2])
+        self.roi_frames += 1
+        self.fraction_sum += crop.shape[0] * crop.shape[1] / float(frame.shape[0] * frame.shape[1])
+
+        xyxy, confs, classes = model.predict(crop, conf=conf, imgsz=self.imgsz)[0]
+        xyxy = xyxy + np.array([x1, y1, x1, y1], dtype=xyxy.dtype)
+        return xyxy, confs, classes
+
+    def draw(self, annotated):
+        if self.last_rect is not None:
+            x1, y1, x2, y2 = self.last_rect
+            cv2.rectangle(annotated, (x1, y1), (x2, y2), (255, 255, 0), 1)
+
+    def get_stats(self):
+        return {
+            "roi_frames": self.roi_frames,
+            "full_frames": self.full_frames,
+            "mean_fraction": self.fraction_sum / self.roi_frames if self.roi_frames else 1.0,
+        }
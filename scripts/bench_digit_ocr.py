@@ -0,0 +1,60 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from smd_digit_ocr import DigitTemplateOCR, load_labeled_crops
+from ocr_resistor import resistor_OCR
+
+# Bandingkan akurasi & latency: template digit vs EasyOCR (recognize / readtext)
+CROP_DIR = "ocr_crops"
+TRAIN_SPLIT = 0.5
+
+
+def run(name, read_fn, samples):
+    correct = 0
+    latencies = []
+    for roi, label in samples:
+        start = time.perf_counter()
+        marking, _ = read_fn(roi)
+        latencies.append((time.perf_counter() - start) * 1000)
+        correct += int(marking == label)
+
+    latencies = np.array(latencies)
+    print(f"{name:<22} acc: {correct / len(samples) * 100:5.1f}% | "
+          f"mean: {latencies.mean():8.3f} ms | p95: {np.percentile(latencies, 95):8.3f} ms")
+
+
+if __name__ == "__main__":
+    crop_dir = sys.argv[1] if len(sys.argv) > 1 else CROP_DIR
+    samples = load_labeled_crops(crop_dir)
+    if len(samples) < 2:
+        print(f"Need at least 2 labeled crops in {crop_dir}")
+        sys.exit(1)
+
+    # Split train / test supaya template tidak dites pada crop yang sama
+    rng = np.random.default_rng(0)
+    order = rng.permutation(len(samples))
+    n_train = max(1, int(len(samples) * TRAIN_SPLIT))
+    train = [samples[i] for i in order[:n_train]]
+    test = [samples[i] for i in order[n_train:]]
+
+    digit_ocr = DigitTemplateOCR()
+    used = digit_ocr.fit(train)
+    print(f"Train: {len(train)} crops ({used} usable) | Test: {len(test)} crops\n")
+
+    run("Digit template", digit_ocr.read, test)
+
+    ocr = resistor_OCR()
+    ocr.digit_ocr = None
+    ocr.ocr_mode = "recognize"
+    run("EasyOCR recognize", ocr.read_resistor_roi, test)
+    ocr.ocr_mode = "readtext"
+    run("EasyOCR readtext", ocr.read_resistor_roi, test)
+
+    ocr.digit_ocr = digit_ocr
+    ocr.ocr_mode = "recognize"
+    run("Digit + EasyOCR", ocr.read_resistor_roi, test)
@@ -0,0 +1,85 @@
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from inference_engine import BACKENDS, InferenceEngine
+from tracker import iou_matrix, greedy_match
+
+# Latency tiap backend dan kecocokan deteksinya dengan output PyTorch
+# Pemakaian: python scripts/bench_engines.py <weights.pt> <folder gambar>
+WEIGHTS = "KP_best5.pt"
+IMAGE_DIR = "."
+CONF = 0.5
+IMGSZ = 640
+WARMUP = 3
+REPEAT = 20
+
+
+def load_images(directory):
+    images = []
+    for name in sorted(os.listdir(directory)):
+        if name.lower().endswith((".png", ".jpg", ".jpeg")):
+            img = cv2.imread(os.path.join(directory, name))
+            if img is not None:
+                images.append(img)
+    return images
+
+
+def agreement(reference, detections, iou_threshold=0.5):
+    """Fraksi box yang cocok (class sama, IoU >= threshold) dan selisih conf rata-rata"""
+    ref_xyxy, ref_conf, ref_cls = reference
+    xyxy, conf, cls = detections
+    total = max(len(ref_cls), len(cls))
+    if total == 0:
+        return 1.0, 0.0
+
+    iou = iou_matrix(ref_xyxy.astype(np.float32), xyxy.astype(np.float32))
+    iou[ref_cls[:, None] != cls[None, :]] = 0
+    matches = greedy_match(iou, iou_threshold)
+    conf_diff = [abs(float(ref_conf[r]) - float(conf[c])) for r, c in matches]
+    return len(matches) / total, float(np.mean(conf_diff)) if conf_diff else 0.0
+
+
+if __name__ == "__main__":
+    weights = sys.argv[1] if len(sys.argv) > 1 else WEIGHTS
+    image_dir = sys.argv[2] if len(sys.argv) > 2 else IMAGE_DIR
+    images = load_images(image_dir)
+    if not images:
+        print(f"No images in {image_dir}")
+        sys.exit(1)
+
+    reference = None
+    baseline_ms = None
+    print(f"{'backend':<10} {'median ms':>10} {'p95 ms':>8} {'speedup':>8} {'agree':>7} {'conf diff':>10}")
+    for backend in BACKENDS:
+        try:
+            engine = InferenceEngine(weights, backend, IMGSZ)
+        except Exception as e:
+            print(f"{backend:<10} not available: {e}")
+            continue
+
+        for img in images[:WARMUP]:
+            engine.predict(img, conf=CONF)
+
+        times, outputs = [], []
+        for _ in range(REPEAT):
+            for img in images:
+                start = time.perf_counter()
+                outputs.append(engine.predict(img, conf=CONF)[0])
+                times.append((time.perf_counter() - start) * 1000)
+        outputs = outputs[:len(images)]
+
+        if reference is None:
+            reference = outputs
+            baseline_ms = np.median(times)
+
+        scores = [agreement(ref, out) for ref, out in zip(reference, outputs)]
+        agree = np.mean([s[0] for s in scores])
+        conf_diff = np.mean([s[1] for s in scores])
+        print(f"{backend:<10} {np.median(times):>10.1f} {np.percentile(times, 95):>8.1f} "
+              f"{baseline_ms / np.median(times):>7.2f}x {agree * 100:>6.1f}% {conf_diff:>10.4f}")
@@ -0,0 +1,93 @@
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import torch
+from ultralytics.engine.results import Boxes
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from filtering_area import filter_detections, boxes_to_arrays, best_per_class, validate_component_counts
+from area_rules import parse_area_rules
+
+# Micro-benchmark post-processing deteksi: loop per box (lama) vs numpy (baru)
+AREA = "Area 6"
+BOX_COUNTS = [50, 100, 200, 300]
+REPEAT = 200
+
+CLASS_NAMES = [
+    "Button", "Buzzer", "Capasitor", "Connector", "Dioda", "IC", "Inductor", "Jumper",
+    "LED", "Oscillator", "Regulator", "Resistor", "Switch", "Transistor",
+    "No capacitor", "No resitor", "No jackcable", "Missalignment", "wrong component",
+]
+model = SimpleNamespace(names=dict(enumerate(CLASS_NAMES)))
+
+
+def make_boxes(n, rng):
+    xy = rng.uniform(0, 600, (n, 2))
+    wh = rng.uniform(10, 60, (n, 2))
+    data = np.column_stack([xy, xy + wh, rng.uniform(0.3, 1.0, n), rng.integers(0, len(CLASS_NAMES), n)])
+    return Boxes(torch.tensor(data, dtype=torch.float32), (720, 1280))
+
+
+def legacy_postprocess(boxes):
+    rules = parse_area_rules(AREA)
+    allowed_components = set(rules.keys())
+    ok_detections, defect_detections, component_counts = [], [], {}
+    for box in boxes:
+        cls_id = int(box.cls[0])
+        cls_name = model.names[cls_id]
+        if cls_name.startswith("No "):
+            defect_detections.append({"box": box, "type": "missing",
+                                      "component": cls_name.replace("No ", ""), "class_name": cls_name})
+        elif cls_name in allowed_components:
+            ok_detections.append(box)
+            component_counts[cls_name] = component_counts.get(cls_name, 0) + 1
+    validation = validate_component_counts(AREA, component_counts, defect_detections, rules)
+    filtered = ok_detections + [d["box"] for d in defect_detections]
+
+    best_boxes = {}
+    for box in filtered:
+        cls_id = int(box.cls[0])
+        conf = float(box.conf[0])
+        if cls_id not in best_boxes or conf >= best_boxes[cls_id]['conf']:
+            best_boxes[cls_id] = {'conf': conf, 'box': box}
+    for data in best_boxes.values():
+        x1, y1, x2, y2 = map(int, data['box'].xyxy[0])
+    return validation, best_boxes
+
+
+def vectorized_postprocess(boxes):
+    xyxy, confs, classes = boxes_to_arrays(boxes)
+    keep, validation = filter_detections(AREA, (xyxy, confs, classes), model)
+    best_idx = keep[best_per_class(classes[keep], confs[keep])]
+    best_boxes = {
+        int(classes[i]): {'conf': float(confs[i]), 'xyxy': xyxy[i].astype(int).tolist()}
+        for i in best_idx
+    }
+    return validation, best_boxes
+
+
+def timeit(fn, boxes):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        fn(boxes)
+    return (time.perf_counter() - start) / REPEAT * 1000
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    print(f"{'boxes':>6} | {'loop (ms)':>10} | {'numpy (ms)':>10} | speedup")
+    for n in BOX_COUNTS:
+        boxes = make_boxes(n, rng)
+
+        old_val, old_best = legacy_postprocess(boxes)
+        new_val, new_best = vectorized_postprocess(boxes)
+        assert old_val == new_val, "validation mismatch"
+        assert {k: v['conf'] for k, v in old_best.items()} == {k: v['conf'] for k, v in new_best.items()}
+
+        t_old = timeit(legacy_postprocess, boxes)
+        t_new = timeit(vectorized_postprocess, boxes)
+        print(f"{n:>6} | {t_old:>10.3f} | {t_new:>10.3f} | {t_old / t_new:6.1f}x")
@@ -0,0 +1,35 @@
+import os
+import sys
+
+import cv2
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from area_recognizer import AreaRecognizer
+
+# Gambar referensi: area_references/<Area N>/*.png
+REFERENCE_DIR = "area_references"
+CACHE = "area_descriptors.npz"
+
+if __name__ == "__main__":
+    reference_dir = sys.argv[1] if len(sys.argv) > 1 else REFERENCE_DIR
+    cache = sys.argv[2] if len(sys.argv) > 2 else CACHE
+
+    recognizer = AreaRecognizer(reference_dir=reference_dir, cache_path=cache)
+    if not recognizer.load():
+        print(f"No usable reference images in {reference_dir}")
+        sys.exit(1)
+    print(f"{len(recognizer.descriptors)} descriptors from {len(recognizer.areas)} areas -> {cache}")
+
+    # Cek: setiap gambar referensi harus dikenali sebagai area-nya sendiri
+    correct, total = 0, 0
+    for area, path in recognizer.reference_files():
+        image = cv2.imread(path)
+        if image is None:
+            continue
+        predicted, votes = recognizer.recognize(image)
+        total += 1
+        correct += predicted == area
+        mark = "OK " if predicted == area else "ERR"
+        print(f"{mark} {path}: {predicted} ({votes} matches)")
+    print(f"Recognized {correct}/{total}")
@@ -1,11 +1,15 @@
-from ultralytics import YOLO
 import cv2
 from collections import defaultdict
 import os
+import sys
 from datetime import datetime
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from inference_engine import load_engine
+
 # Load model
-model = YOLO("/home/syahla/PCB_QualityControl/KP_best5.pt")
+model = load_engine("/home/syahla/PCB_QualityControl/KP_best5.pt")
 
 cap = cv2.VideoCapture(2, cv2.CAP_ANY)
 path = "/home/syahla/kp/0706dfa3-62ca-4803-94ee-b51bfec14bc6.jpeg"
@@ -0,0 +1,23 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from smd_digit_ocr import DigitTemplateOCR
+
+# Crop dari OCR_CROP_DIR, nama file: <marking>_<timestamp>.png
+CROP_DIR = "ocr_crops"
+OUTPUT = "digit_templates.npz"
+
+if __name__ == "__main__":
+    crop_dir = sys.argv[1] if len(sys.argv) > 1 else CROP_DIR
+    output = sys.argv[2] if len(sys.argv) > 2 else OUTPUT
+
+    digit_ocr = DigitTemplateOCR()
+    used = digit_ocr.fit_from_dir(crop_dir)
+    if not digit_ocr.is_ready:
+        print(f"No usable crops in {crop_dir}")
+        sys.exit(1)
+
+    digit_ocr.save(output)
+    print(f"Fitted {len(digit_ocr.labels)} glyph templates from {used} crops -> {output}")
@@ -0,0 +1,35 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from quantization import quantize_model
+
+# Pemakaian: python scripts/quantize_model.py <weights.pt> <onnx|openvino> <folder frame> <data.yaml>
+# folder frame = frame yang di-capture dari kamera line (kalibrasi, tanpa label),
+# data.yaml    = dataset validasi berlabel yang sama dengan notebook training
+WEIGHTS = "KP_best5.pt"
+BACKEND = "openvino"
+FRAMES_DIR = "calibration_frames"
+DATA_YAML = "data.yaml"
+MAX_RECALL_DROP = 0.02
+
+if __name__ == "__main__":
+    weights = sys.argv[1] if len(sys.argv) > 1 else WEIGHTS
+    backend = sys.argv[2] if len(sys.argv) > 2 else BACKEND
+    frames_dir = sys.argv[3] if len(sys.argv) > 3 else FRAMES_DIR
+    data_yaml = sys.argv[4] if len(sys.argv) > 4 else DATA_YAML
+
+    report = quantize_model(weights, backend, frames_dir, data_yaml, max_drop=MAX_RECALL_DROP)
+
+    print(f"Calibrated on {report['calibration_frames']} frames")
+    print(f"{'class':<20} {'fp32':>6} {'int8':>6}")
+    for row in report["defect_recall"]:
+        mark = "  <-- recall drop" if row["failed"] else ""
+        print(f"{row['class']:<20} {row['fp32']:>6.3f} {row['int8']:>6.3f}{mark}")
+
+    if report["accepted"]:
+        print(f"Accepted: {report['model']} (use PCB_QC_BACKEND={backend}_int8)")
+    else:
+        print(f"Rejected: {report['reason']}")
+        sys.exit(1)
@@ -0,0 +1,140 @@
+import os
+
+import cv2
+import numpy as np
+
+GLYPH_W = 12
+GLYPH_H = 20
+CHARSET = "0123456789R"
+
+
+class DigitTemplateOCR:
+    """
+    Pembaca kode SMD (3/4 digit EIA, mis. "1002", "133") pakai template matching.
+
+    ROI di-threshold (Otsu), dipecah per glyph dengan connected components,
+    setiap glyph di-resize ke GLYPH_W x GLYPH_H lalu dicocokkan ke template
+    dengan korelasi ternormalisasi (satu perkalian matriks untuk semua glyph).
+    Template di-fit dari crop resistor yang disimpan waktu produksi.
+    """
+    def __init__(self, labels=None, vectors=None):
+        self.labels = np.asarray(labels if labels is not None else [], dtype="<U1")
+        self.vectors = (np.asarray(vectors, dtype=np.float32) if vectors is not None
+                        else np.zeros((0, GLYPH_W * GLYPH_H), dtype=np.float32))
+
+    @property
+    def is_ready(self):
+        return len(self.labels) > 0
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        return cls(data["labels"], data["vectors"])
+
+    def save(self, path):
+        np.savez_compressed(path, labels=self.labels, vectors=self.vectors)
+
+    def _to_gray(self, roi):
+        if roi.ndim == 3:
+            return cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
+        return roi
+
+    def _normalize(self, glyph):
+        vec = glyph.astype(np.float32).ravel()
+        vec -= vec.mean()
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm > 0 else vec
+
+    def segment(self, gray):
+        """
+        Pecah ROI grayscale jadi glyph, urut kiri ke kanan.
+        Returns: array (n_glyph, GLYPH_W * GLYPH_H)
+        """
+        h, w = gray.shape[:2]
+        if h < 8 or w < 8:
+            return np.zeros((0, GLYPH_W * GLYPH_H), dtype=np.float32)
+
+        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        # Tulisan biasanya putih di badan hitam -> foreground = bagian yang lebih sedikit
+        if cv2.countNonZero(binary) > binary.size / 2:
+            binary = cv2.bitwise_not(binary)
+
+        n, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+        boxes = []
+        for i in range(1, n):
+            x, y, bw, bh, area = stats[i]
+            if bh < 0.3 * h or bh > 0.95 * h or bw > 0.5 * w or area < 6:
+                continue
+            boxes.append((x, y, bw, bh))
+        boxes.sort(key=lambda b: b[0])
+
+        glyphs = []
+        for x, y, bw, bh in boxes:
+            glyph = cv2.resize(binary[y:y + bh, x:x + bw], (GLYPH_W, GLYPH_H), interpolation=cv2.INTER_AREA)
+            glyphs.append(self._normalize(glyph))
+
+        if not glyphs:
+            return np.zeros((0, GLYPH_W * GLYPH_H), dtype=np.float32)
+        return np.stack(glyphs)
+
+    def _match(self, glyphs):
+        scores = glyphs @ self.vectors.T
+        best = np.argmax(scores, axis=1)
+        best_scores = scores[np.arange(len(glyphs)), best]
+        return "".join(self.labels[best]), float(best_scores.min())
+
+    def read(self, roi):
+        """
+        Returns: (marking, conf), conf = korelasi glyph terburuk (0..1)
+        """
+        if not self.is_ready or roi.size == 0:
+            return None, 0.0
+
+        gray = self._to_gray(roi)
+        best = (None, 0.0)
+        # Orientasi normal dan 180 derajat
+        for img in (gray, cv2.rotate(gray, cv2.ROTATE_180)):
+            glyphs = self.segment(img)
+            if len(glyphs) not in (3, 4):
+                continue
+            marking, conf = self._match(glyphs)
+            if conf > best[1]:
+                best = (marking, max(0.0, conf))
+        return best
+
+    def fit(self, samples):
+        """
+        samples: [(roi, label), ...], label = marking yang benar (mis. "1002")
+        Glyph hanya dipakai kalau jumlah hasil segmentasi sama dengan panjang label.
+        Returns: jumlah sample yang terpakai
+        """
+        labels, vectors = [], []
+        used = 0
+        for roi, label in samples:
+            glyphs = self.segment(self._to_gray(roi))
+            if len(glyphs) != len(label) or any(c not in CHARSET for c in label):
+                continue
+            labels.extend(label)
+            vectors.extend(glyphs)
+            used += 1
+
+        if vectors:
+            self.labels = np.asarray(labels, dtype="<U1")
+            self.vectors = np.stack(vectors).astype(np.float32)
+        return used
+
+    def fit_from_dir(self, directory):
+        """Fit dari folder crop, nama file: <marking>_<apa saja>.png"""
+        return self.fit(load_labeled_crops(directory))
+
+
+def load_labeled_crops(directory):
+    samples = []
+    for name in sorted(os.listdir(directory)):
+        if not name.lower().endswith((".png", ".jpg", ".jpeg")):
+            continue
+        label = name.split("_")[0].upper()
+        img = cv2.imread(os.path.join(directory, name))
+        if img is not None and label:
+            samples.append((img, label))
+    return samples
@@ -0,0 +1,167 @@
+import numpy as np
+
+
+def iou_matrix(a, b):
+    """IoU antara setiap box di a (N x 4) dan b (M x 4), format xyxy"""
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros((len(a), len(b)), dtype=np.float32)
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0).astype(np.float32)
+
+
+def greedy_match(iou, threshold):
+    """Pasangkan baris-kolom dengan IoU tertinggi lebih dulu. Returns: [(row, col), ...]"""
+    if iou.size == 0:
+        return []
+    rows, cols = np.unravel_index(np.argsort(-iou, axis=None), iou.shape)
+    used_rows, used_cols, matches = set(), set(), []
+    for r, c in zip(rows, cols):
+        if iou[r, c] < threshold:
+            break
+        if r in used_rows or c in used_cols:
+            continue
+        used_rows.add(r)
+        used_cols.add(c)
+        matches.append((int(r), int(c)))
+    return matches
+
+
+class Track:
+    __slots__ = ("track_id", "box", "velocity", "conf", "hits", "age",
+                 "time_since_update", "class_votes", "vote_window")
+
+    def __init__(self, track_id, box, conf, cls_id, vote_window):
+        self.track_id = track_id
+        self.box = box.astype(np.float32)
+        self.velocity = np.zeros(4, dtype=np.float32)
+        self.conf = float(conf)
+        self.hits = 1
+        self.age = 0
+        self.time_since_update = 0
+        self.vote_window = vote_window
+        self.class_votes = [(int(cls_id), float(conf))]
+
+    def predict(self):
+        self.box = self.box + self.velocity
+        self.age += 1
+        self.time_since_update += 1
+
+    def update(self, box, conf, cls_id, alpha, beta):
+        # Filter alpha-beta (Kalman kecepatan konstan dengan gain tetap)
+        residual = box - self.box
+        self.box = self.box + alpha * residual
+        self.velocity = self.velocity + beta * residual
+        self.conf = float(conf)
+        self.hits += 1
+        self.time_since_update = 0
+        self.class_votes.append((int(cls_id), float(conf)))
+        if len(self.class_votes) > self.vote_window:
+            self.class_votes.pop(0)
+
+    @property
+    def cls_id(self):
+        """Class hasil voting berbobot confidence selama vote_window update terakhir"""
+        weights = {}
+        for cls_id, conf in self.class_votes:
+            weights[cls_id] = weights.get(cls_id, 0.0) + conf
+        return max(weights, key=weights.get)
+
+
+class ComponentTracker:
+    """
+    Multi-object tracker ringan gaya ByteTrack.
+
+    Asosiasi dua tahap pakai IoU terhadap posisi prediksi track: deteksi
+    confidence tinggi dulu, lalu deteksi confidence rendah untuk track yang
+    belum dapat pasangan. Track baru hanya dibuat dari deteksi confidence
+    tinggi dan dianggap confirmed setelah `min_hits` update. Class setiap
+    track ditentukan voting, jadi jumlah komponen dihitung dari track, bukan
+    dari satu frame.
+    """
+    def __init__(self, high_conf=0.6, low_conf=0.3, match_iou=0.3, low_match_iou=0.5,
+                 min_hits=3, max_age=10, vote_window=15, alpha=0.6, beta=0.1):
+        self.high_conf = high_conf
+        self.low_conf = low_conf
+        self.match_iou = match_iou
+        self.low_match_iou = low_match_iou
+        self.min_hits = min_hits
+        self.max_age = max_age
+        self.vote_window = vote_window
+        self.alpha = alpha
+        self.beta = beta
+
+        self.tracks = []
+        self.next_id = 1
+
+    def reset(self):
+        self.tracks = []
+
+    def update(self, xyxy, conf, cls):
+        """
+        xyxy (N x 4), conf (N), cls (N) dari satu frame
+        Returns: list Track yang confirmed dan ter-update di frame ini
+        """
+        for track in self.tracks:
+            track.predict()
+
+        high = np.flatnonzero(conf >= self.high_conf)
+        low = np.flatnonzero((conf >= self.low_conf) & (conf < self.high_conf))
+
+        track_boxes = (np.stack([t.box for t in self.tracks]) if self.tracks
+                       else np.zeros((0, 4), dtype=np.float32))
+
+        # Tahap 1: deteksi confidence tinggi
+        matches = greedy_match(iou_matrix(track_boxes, xyxy[high]), self.match_iou)
+        matched_tracks = set()
+        matched_high = set()
+        for t, d in matches:
+            det = high[d]
+            self.tracks[t].update(xyxy[det], conf[det], cls[det], self.alpha, self.beta)
+            matched_tracks.add(t)
+            matched_high.add(d)
+
+        # Tahap 2: track sisa dengan deteksi confidence rendah
+        remaining = [t for t in range(len(self.tracks)) if t not in matched_tracks]
+        if remaining and len(low):
+            low_matches = greedy_match(iou_matrix(track_boxes[remaining], xyxy[low]), self.low_match_iou)
+            for r, d in low_matches:
+                det = low[d]
+                self.tracks[remaining[r]].update(xyxy[det], conf[det], cls[det], self.alpha, self.beta)
+
+        # Deteksi tinggi yang belum punya track -> track baru
+        for d in range(len(high)):
+            if d in matched_high:
+                continue
+            det = high[d]
+            self.tracks.append(Track(self.next_id, xyxy[det], conf[det], cls[det], self.vote_window))
+            self.next_id += 1
+
+        self.tracks = [t for t in self.tracks if t.time_since_update <= self.max_age]
+        return self.confirmed_tracks()
+
+    def confirmed_tracks(self):
+        return [t for t in self.tracks if t.hits >= self.min_hits and t.time_since_update == 0]
+
+    def counts(self, n_classes):
+        """Jumlah komponen per class id dari track yang confirmed"""
+        classes = [t.cls_id for t in self.confirmed_tracks()]
+        return np.bincount(np.asarray(classes, dtype=np.int64), minlength=n_classes)
+
+    def to_arrays(self, tracks):
+        """Track -> (xyxy, conf, cls, track_ids) supaya bisa masuk filter_detections"""
+        if not tracks:
+            return (np.zeros((0, 4), dtype=np.float32), np.zeros(0, dtype=np.float32),
+                    np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+        return (
+            np.stack([t.box for t in tracks]),
+            np.array([t.conf for t in tracks], dtype=np.float32),
+            np.array([t.cls_id for t in tracks], dtype=np.int64),
+            np.array([t.track_id for t in tracks], dtype=np.int64),
+        )